@@ -0,0 +1,125 @@
+# Deterministic, PokeAPI-shaped fixtures for the offline benchmarks: a full-size name list,
+# all 18 types with their real damage relations and one payload per pokemon
+import random
+
+BASE_URL = "https://pokeapi.co/api/v2"
+FIXTURE_SEED = 1
+FIXTURE_POKEMON = 1000
+
+TYPE_NAMES = [
+    "normal", "fire", "water", "electric", "grass", "ice", "fighting", "poison",
+    "ground", "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy"
+]
+# Attacking type -> (double damage to, half damage to, no damage to)
+DAMAGE_TO = {
+    'normal': ((), ('rock', 'steel'), ('ghost',)),
+    'fire': (('grass', 'ice', 'bug', 'steel'), ('fire', 'water', 'rock', 'dragon'), ()),
+    'water': (('fire', 'ground', 'rock'), ('water', 'grass', 'dragon'), ()),
+    'electric': (('water', 'flying'), ('electric', 'grass', 'dragon'), ('ground',)),
+    'grass': (('water', 'ground', 'rock'), ('fire', 'grass', 'poison', 'flying', 'bug', 'dragon', 'steel'), ()),
+    'ice': (('grass', 'ground', 'flying', 'dragon'), ('fire', 'water', 'ice', 'steel'), ()),
+    'fighting': (('normal', 'ice', 'rock', 'dark', 'steel'), ('poison', 'flying', 'psychic', 'bug', 'fairy'), ('ghost',)),
+    'poison': (('grass', 'fairy'), ('poison', 'ground', 'rock', 'ghost'), ('steel',)),
+    'ground': (('fire', 'electric', 'poison', 'rock', 'steel'), ('grass', 'bug'), ('flying',)),
+    'flying': (('grass', 'fighting', 'bug'), ('electric', 'rock', 'steel'), ()),
+    'psychic': (('fighting', 'poison'), ('psychic', 'steel'), ('dark',)),
+    'bug': (('grass', 'psychic', 'dark'), ('fire', 'fighting', 'poison', 'flying', 'ghost', 'steel', 'fairy'), ()),
+    'rock': (('fire', 'ice', 'flying', 'bug'), ('fighting', 'ground', 'steel'), ()),
+    'ghost': (('psychic', 'ghost'), ('dark',), ('normal',)),
+    'dragon': (('dragon',), ('steel',), ('fairy',)),
+    'dark': (('psychic', 'ghost'), ('fighting', 'dark', 'fairy'), ()),
+    'steel': (('ice', 'rock', 'fairy'), ('fire', 'water', 'electric', 'steel'), ()),
+    'fairy': (('fighting', 'dragon', 'dark'), ('fire', 'poison', 'steel'), ())
+}
+STAT_NAMES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+# A few real species (name, id, types) so benchmark queries look like real ones
+REAL_POKEMON = [
+    ("bulbasaur", 1, ["grass", "poison"]), ("charizard", 6, ["fire", "flying"]),
+    ("pikachu", 25, ["electric"]), ("gengar", 94, ["ghost", "poison"]),
+    ("gyarados", 130, ["water", "flying"]), ("eevee", 133, ["normal"]),
+    ("snorlax", 143, ["normal"]), ("mewtwo", 150, ["psychic"]),
+    ("scizor", 212, ["bug", "steel"]), ("tyranitar", 248, ["rock", "dark"]),
+    ("garchomp", 445, ["dragon", "ground"]), ("lucario", 448, ["fighting", "steel"])
+]
+NAME_SYLLABLES = [
+    "char", "mel", "saur", "pika", "chu", "bul", "ba", "gen", "gar", "tyra", "nit", "luca",
+    "rio", "scy", "ther", "ee", "vee", "snor", "lax", "mew", "two", "zor", "ua", "ark",
+    "dra", "goon", "sli", "fla", "pple", "tor", "nado", "quil", "mon", "lit", "wig"
+]
+
+def type_ref(type_name):
+    return {'name': type_name, 'url': f"{BASE_URL}/type/{TYPE_NAMES.index(type_name) + 1}/"}
+
+def type_payload(type_name):
+    # /type/{name} payload with both directions of damage relations
+    double_to, half_to, no_to = DAMAGE_TO[type_name]
+    return {
+        'id': TYPE_NAMES.index(type_name) + 1,
+        'name': type_name,
+        'damage_relations': {
+            'double_damage_to': [type_ref(t) for t in double_to],
+            'half_damage_to': [type_ref(t) for t in half_to],
+            'no_damage_to': [type_ref(t) for t in no_to],
+            'double_damage_from': [type_ref(t) for t in TYPE_NAMES if type_name in DAMAGE_TO[t][0]],
+            'half_damage_from': [type_ref(t) for t in TYPE_NAMES if type_name in DAMAGE_TO[t][1]],
+            'no_damage_from': [type_ref(t) for t in TYPE_NAMES if type_name in DAMAGE_TO[t][2]]
+        }
+    }
+
+def pokemon_payload(rng, name, pokemon_id, types):
+    # /pokemon/{name} payload, including the bulky move and game lists real payloads carry
+    moves = [
+        {
+            'move': {'name': f"move-{move_id}", 'url': f"{BASE_URL}/move/{move_id}/"},
+            'version_group_details': [
+                {
+                    'level_learned_at': rng.randint(0, 60),
+                    'move_learn_method': {'name': "level-up", 'url': f"{BASE_URL}/move-learn-method/1/"},
+                    'version_group': {'name': f"group-{group}", 'url': f"{BASE_URL}/version-group/{group}/"}
+                }
+                for group in range(rng.randint(1, 6))
+            ]
+        }
+        for move_id in rng.sample(range(1, 900), rng.randint(20, 100))
+    ]
+    return {
+        'id': pokemon_id,
+        'name': name,
+        'base_experience': rng.randint(40, 300),
+        'height': rng.randint(2, 200),
+        'weight': rng.randint(10, 5000),
+        'abilities': [
+            {'ability': {'name': f"ability-{a}", 'url': f"{BASE_URL}/ability/{a}/"}, 'is_hidden': i > 0, 'slot': i + 1}
+            for i, a in enumerate(rng.sample(range(1, 300), 2))
+        ],
+        'game_indices': [
+            {'game_index': pokemon_id, 'version': {'name': f"version-{v}", 'url': f"{BASE_URL}/version/{v}/"}}
+            for v in range(1, rng.randint(2, 20))
+        ],
+        'moves': moves,
+        'sprites': {'front_default': f"https://example.invalid/sprites/{pokemon_id}.png"},
+        'stats': [
+            {'base_stat': rng.randint(20, 160), 'effort': 0, 'stat': {'name': stat, 'url': f"{BASE_URL}/stat/{i + 1}/"}}
+            for i, stat in enumerate(STAT_NAMES)
+        ],
+        'types': [{'slot': i + 1, 'type': type_ref(t)} for i, t in enumerate(types)]
+    }
+
+def generate_fixtures(count=FIXTURE_POKEMON, seed=FIXTURE_SEED):
+    # {'names': [...], 'types': {name: payload}, 'pokemon': {name: payload}}, identical per seed
+    rng = random.Random(seed)
+    species = list(REAL_POKEMON)
+    names = {name for name, _, _ in species}
+    next_id = 1000
+    while len(species) < count:
+        name = "".join(rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(2, 3)))
+        if name in names:
+            continue
+        names.add(name)
+        species.append((name, next_id, rng.sample(TYPE_NAMES, rng.choice([1, 2]))))
+        next_id += 1
+    return {
+        'names': [name for name, _, _ in species],
+        'types': {t: type_payload(t) for t in TYPE_NAMES},
+        'pokemon': {name: pokemon_payload(rng, name, pokemon_id, types) for name, pokemon_id, types in species}
+    }
@@ -0,0 +1,68 @@
+# Import-time guard for pokedex.py: the CLI runs as a short-lived process per query, so importing
+# the module must stay fast and must not pull in the heavy dependencies it only needs later.
+#
+#   python benchmarks/import_time.py [--runs N] [--budget-ms MS]
+#
+# Exits non-zero when a heavy module is imported eagerly or the import exceeds the budget.
+import argparse
+import os
+import py_compile
+import re
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported on first use
+HEAVY_MODULES = ["requests", "aiohttp", "asyncio", "numpy", "fuzzywuzzy", "rapidfuzz", "concurrent.futures"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def measure_import():
+    # Import pokedex in a fresh interpreter; returns ({module: cumulative us}, pokedex cumulative us)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pokedex"],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules, modules["pokedex"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Guard the import time of pokedex.py")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters to time (default: 7)")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="maximum median import time (default: 50)")
+    args = parser.parse_args()
+
+    # Time the import as installed code runs it, from cached bytecode
+    py_compile.compile(os.path.join(REPO_DIR, "pokedex.py"))
+
+    timings = []
+    eager = set()
+    for _ in range(args.runs):
+        modules, total = measure_import()
+        timings.append(total / 1000)
+        eager |= {
+            heavy for heavy in HEAVY_MODULES
+            if any(name == heavy or name.startswith(heavy + ".") for name in modules)
+        }
+
+    median = statistics.median(timings)
+    print(f"import pokedex: median {median:.1f} ms, best {min(timings):.1f} ms over {args.runs} runs")
+    failed = False
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(sorted(eager))}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: median import time exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+# Local PokeAPI stand-in for load and throughput testing. Serves /pokemon, /type and their
+# list endpoints from recorded fixtures (or generated ones, see fixtures.py), with injectable
+# latency, 5xx errors and 429 rate limiting, and ETag / If-None-Match revalidation.
+#
+#   python benchmarks/mock_pokeapi.py --latency 0.05 --error-rate 0.02 --rate-limit 200
+#   POKEAPI_BASE_URL=http://127.0.0.1:8765/api/v2 python pokedex.py
+#
+#   python benchmarks/mock_pokeapi.py --record recorded/ --limit 200   # record real responses
+#   python benchmarks/mock_pokeapi.py --fixtures recorded/             # serve them
+#
+# GET /_stats reports request counts per status and the peak number of requests in flight.
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from fixtures import FIXTURE_POKEMON, FIXTURE_SEED, TYPE_NAMES, generate_fixtures
+
+MOCK_HOST = "127.0.0.1"
+MOCK_PORT = 8765
+API_PREFIX = "/api/v2"
+# Status codes returned for injected errors
+MOCK_ERROR_STATUSES = (500, 502, 503)
+# Page size of list endpoints without ?limit=, as on PokeAPI
+MOCK_DEFAULT_LIMIT = 20
+
+def write_fixtures(fixtures, directory):
+    # Fixtures as recorded responses: pokemon/{name}.json, type/{name}.json and names.json
+    for kind in ('pokemon', 'types'):
+        os.makedirs(os.path.join(directory, kind), exist_ok=True)
+        for name, data in fixtures[kind].items():
+            with open(os.path.join(directory, kind, f"{name}.json"), 'w') as f:
+                json.dump(data, f)
+    with open(os.path.join(directory, "names.json"), 'w') as f:
+        json.dump(fixtures['names'], f)
+
+def load_fixtures(directory):
+    # Inverse of write_fixtures; the same shape generate_fixtures returns
+    fixtures = {'names': [], 'types': {}, 'pokemon': {}}
+    for kind in ('pokemon', 'types'):
+        kind_dir = os.path.join(directory, kind)
+        for file_name in sorted(os.listdir(kind_dir)) if os.path.isdir(kind_dir) else []:
+            if file_name.endswith(".json"):
+                with open(os.path.join(kind_dir, file_name)) as f:
+                    fixtures[kind][file_name[:-len(".json")]] = json.load(f)
+    names_file = os.path.join(directory, "names.json")
+    if os.path.exists(names_file):
+        with open(names_file) as f:
+            fixtures['names'] = json.load(f)
+    else:
+        fixtures['names'] = sorted(fixtures['pokemon'], key=lambda name: fixtures['pokemon'][name].get('id', 0))
+    return fixtures
+
+def record_fixtures(directory, limit=None):
+    # Download real responses through pokedex's client (honours POKEAPI_BASE_URL) and write them
+    import pokedex
+    names = [entry['name'] for entry in pokedex.api_get_json(pokedex.POKEMON_NAMES_PATH)['results']]
+    if limit is not None:
+        names = names[:limit]
+    fixtures = {'names': names, 'types': {}, 'pokemon': {}}
+    for type_name in TYPE_NAMES:
+        fixtures['types'][type_name] = pokedex.api_get_json(f"type/{type_name}")
+    for i, name in enumerate(names, 1):
+        try:
+            fixtures['pokemon'][name] = pokedex.api_get_json(f"pokemon/{name}")
+        except pokedex.requests.RequestException as e:
+            print(f"Skipping {name}: {e}")
+        if i % 100 == 0:
+            print(f"Recorded {i}/{len(names)} Pokémon")
+    write_fixtures(fixtures, directory)
+    return fixtures
+
+def create_mock_app(fixtures, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=None, seed=0):
+    # aiohttp app serving the fixtures under /api/v2. Every response waits latency plus up to
+    # jitter seconds; error_rate of them fail with a 5xx; beyond rate_limit requests per second
+    # (token bucket, one second of burst) requests get 429 with Retry-After
+    from aiohttp import web
+
+    rng = random.Random(seed)
+    stats = {'requests': 0, 'in_flight': 0, 'max_in_flight': 0, 'statuses': Counter()}
+    bucket = {'tokens': float(rate_limit or 0), 'updated': time.monotonic()}
+    # (kind, key) -> (body, etag), encoded on first request
+    encoded = {}
+    resources = {'pokemon': dict(fixtures['pokemon']), 'type': dict(fixtures['types'])}
+    for kind in ('pokemon', 'type'):
+        for data in list(resources[kind].values()):
+            if 'id' in data:
+                resources[kind].setdefault(str(data['id']), data)
+    listings = {'pokemon': list(fixtures['names']), 'type': list(fixtures['types'])}
+
+    def take_token():
+        # Seconds until a request is allowed, 0 if it may proceed now
+        if not rate_limit:
+            return 0
+        now = time.monotonic()
+        bucket['tokens'] = min(rate_limit, bucket['tokens'] + (now - bucket['updated']) * rate_limit)
+        bucket['updated'] = now
+        if bucket['tokens'] >= 1:
+            bucket['tokens'] -= 1
+            return 0
+        return (1 - bucket['tokens']) / rate_limit
+
+    def listing(request, kind):
+        base_url = f"{request.scheme}://{request.host}{API_PREFIX}"
+        limit = int(request.query.get('limit', MOCK_DEFAULT_LIMIT))
+        offset = int(request.query.get('offset', 0))
+        names = listings[kind]
+        page = names[offset:offset + limit]
+        return {
+            'count': len(names),
+            'next': f"{base_url}/{kind}?offset={offset + limit}&limit={limit}" if offset + limit < len(names) else None,
+            'previous': f"{base_url}/{kind}?offset={max(0, offset - limit)}&limit={limit}" if offset else None,
+            'results': [{'name': name, 'url': f"{base_url}/{kind}/{name}/"} for name in page]
+        }
+
+    def respond(request, status, text=None, body=None, headers=None):
+        stats['statuses'][status] += 1
+        if body is not None:
+            return web.Response(status=status, body=body, content_type='application/json', headers=headers)
+        return web.Response(status=status, text=text, headers=headers)
+
+    async def handle(request):
+        stats['requests'] += 1
+        stats['in_flight'] += 1
+        stats['max_in_flight'] = max(stats['max_in_flight'], stats['in_flight'])
+        try:
+            wait = take_token()
+            if wait:
+                return respond(request, 429, "Too Many Requests", headers={'Retry-After': str(math.ceil(wait))})
+            await asyncio.sleep(latency + (rng.uniform(0, jitter) if jitter else 0))
+            if error_rate and rng.random() < error_rate:
+                return respond(request, rng.choice(MOCK_ERROR_STATUSES), "Injected error")
+
+            kind, _, key = request.match_info['path'].strip('/').partition('/')
+            if kind not in resources:
+                return respond(request, 404, "Not Found")
+            if not key:
+                body = json.dumps(listing(request, kind)).encode()
+                return respond(request, 200, body=body)
+            key = key.lower()
+            if (kind, key) not in encoded:
+                data = resources[kind].get(key)
+                if data is None:
+                    return respond(request, 404, "Not Found")
+                body = json.dumps(data).encode()
+                encoded[kind, key] = (body, f'"{hashlib.sha1(body).hexdigest()}"')
+            body, etag = encoded[kind, key]
+            if request.headers.get('If-None-Match') == etag:
+                return respond(request, 304, headers={'ETag': etag})
+            return respond(request, 200, body=body, headers={'ETag': etag})
+        finally:
+            stats['in_flight'] -= 1
+
+    async def handle_stats(request):
+        return web.json_response({**stats, 'statuses': {str(k): v for k, v in stats['statuses'].items()}})
+
+    app = web.Application()
+    app.router.add_get('/_stats', handle_stats)
+    app.router.add_get(API_PREFIX + '/{path:.*}', handle)
+    app['stats'] = stats
+    return app
+
+@contextlib.contextmanager
+def serve_in_thread(app, host=MOCK_HOST, port=0):
+    # Run an aiohttp app on a background event loop; yields its API base URL
+    from aiohttp import web
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, host, port)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{port}{API_PREFIX}"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+def mock_server(fixtures, **options):
+    # Context manager serving fixtures with create_mock_app options on a free port
+    return serve_in_thread(create_mock_app(fixtures, **options))
+
+def main():
+    parser = argparse.ArgumentParser(description="Local PokeAPI stand-in serving recorded fixtures")
+    parser.add_argument("--fixtures", metavar="DIR", help="serve recorded fixtures from DIR (default: generated)")
+    parser.add_argument("--pokemon", type=int, default=FIXTURE_POKEMON, help="generated Pokémon (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=FIXTURE_SEED, help="fixture and fault seed (default: %(default)s)")
+    parser.add_argument("--host", default=MOCK_HOST, help="address to serve on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=MOCK_PORT, help="port to serve on (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 5xx")
+    parser.add_argument("--rate-limit", type=float, help="requests per second before answering 429")
+    parser.add_argument("--record", metavar="DIR", help="record responses from POKEAPI_BASE_URL into DIR and exit")
+    parser.add_argument("--limit", type=int, help="with --record, only the first LIMIT Pokémon")
+    parser.add_argument("--write-fixtures", metavar="DIR", help="write the generated fixtures to DIR and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        fixtures = record_fixtures(args.record, args.limit)
+        print(f"Recorded {len(fixtures['pokemon'])} Pokémon and {len(fixtures['types'])} types to {args.record}")
+        return 0
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else generate_fixtures(args.pokemon, args.seed)
+    if args.write_fixtures:
+        write_fixtures(fixtures, args.write_fixtures)
+        print(f"Wrote {len(fixtures['pokemon'])} Pokémon and {len(fixtures['types'])} types to {args.write_fixtures}")
+        return 0
+
+    from aiohttp import web
+    app = create_mock_app(
+        fixtures, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, seed=args.seed
+    )
+    print(f"Serving {len(fixtures['pokemon'])} Pokémon at http://{args.host}:{args.port}{API_PREFIX}")
+    web.run_app(app, host=args.host, port=args.port, print=None)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+# Offline benchmark suite for the lookup, search and analysis hot paths of pokedex.py.
+# Everything runs against generated fixtures (see fixtures.py) in a temporary cache directory,
+# and load_full_cache crawls the local PokeAPI stand-in in mock_pokeapi.py, so no network
+# access is needed.
+#
+#   python benchmarks/run_benchmarks.py                  # compare against baseline.json
+#   python benchmarks/run_benchmarks.py --save-baseline  # record new baseline numbers
+#
+# Exits non-zero when a benchmark's best round is slower than its baseline by more than
+# --threshold. Baselines are machine specific: they are only compared on the machine and
+# Python version that recorded them, and only with at least MIN_COMPARE_ROUNDS rounds.
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import pokedex
+from fixtures import FIXTURE_POKEMON, FIXTURE_SEED, NAME_SYLLABLES, generate_fixtures
+from mock_pokeapi import mock_server
+
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+# Simulated PokeAPI round-trip time for the load_full_cache benchmark, in seconds
+SERVER_LATENCY = 0.005
+# Fewer rounds than this are too noisy to flag regressions with
+MIN_COMPARE_ROUNDS = 5
+
+def typo_queries(names, count):
+    # Misspelled names (dropped, doubled or swapped letters), the way users mistype them
+    queries = []
+    for i, name in enumerate(names[:count]):
+        position = i % max(1, len(name) - 1)
+        edit = i % 3
+        if edit == 0:
+            queries.append(name[:position] + name[position + 1:])
+        elif edit == 1:
+            queries.append(name[:position] + name[position] + name[position:])
+        else:
+            queries.append(name[:position] + name[position + 1] + name[position] + name[position + 2:])
+    return queries
+
+def search_queries():
+    # Substring searches plus form searches (mega, Gigantamax and regional variants)
+    queries = [syllable for syllable in NAME_SYLLABLES]
+    queries += [syllable[:2] for syllable in NAME_SYLLABLES]
+    queries += ["mega char", "mega ", "gmax pika", "gigantamax ee", "alolan vul", "galarian ", "hisuian zor"]
+    return queries
+
+def bench_find_closest_pokemon_name(fixtures, workdir):
+    queries = typo_queries(fixtures['names'], 200)
+    pokedex.get_all_pokemon_names()
+
+    def run():
+        # Without the resolution cache, so every query is scored
+        pokedex.resolve_pokemon_name.cache_clear()
+        for query in queries:
+            pokedex.find_closest_pokemon_name(query)
+        return len(queries)
+    return run
+
+def bench_search_pokemon(fixtures, workdir):
+    queries = search_queries()
+    pokedex.get_all_pokemon_names()
+
+    def run():
+        for query in queries:
+            pokedex.search_pokemon(query)
+        return len(queries)
+    return run
+
+def bench_load_cache(fixtures, workdir):
+    # The legacy full-payload pokemon_data.json, at full size
+    file_path = os.path.join(workdir, "pokemon_data.json")
+    with open(file_path, 'w') as f:
+        json.dump(fixtures['pokemon'], f)
+
+    def run():
+        pokedex.load_cache(file_path)
+        return 1
+    return run
+
+def bench_build_type_chart(fixtures, workdir):
+    def run():
+        # Cold: the chart and all 171 typing profiles, not the persisted profile table
+        if os.path.exists(pokedex.TYPE_PROFILES_CACHE_FILE):
+            os.remove(pokedex.TYPE_PROFILES_CACHE_FILE)
+        pokedex.build_type_chart()
+        return 1
+    return run
+
+def bench_damage_multipliers(fixtures, workdir):
+    records = [pokedex.PokemonRecord.from_api(data) for data in fixtures['pokemon'].values()]
+
+    def run():
+        for record in records:
+            pokedex.get_damage_multipliers(record.types)
+        return len(records)
+    return run
+
+def bench_analyze_best_attack_strategy(fixtures, workdir):
+    records = [pokedex.PokemonRecord.from_api(data) for data in fixtures['pokemon'].values()]
+    pairs = [(record, pokedex.get_damage_multipliers(record.types)) for record in records]
+
+    def run():
+        for record, damage_multipliers in pairs:
+            pokedex.analyze_best_attack_strategy(record, damage_multipliers)
+        return len(pairs)
+    return run
+
+def bench_analyze_pokemon(fixtures, workdir):
+    records = [pokedex.PokemonRecord.from_api(data) for data in fixtures['pokemon'].values()]
+
+    def run():
+        # Cold: everything display_pokemon_info computes, without memoized results
+        pokedex.ANALYSIS_CACHE.clear()
+        for record in records:
+            pokedex.analyze_pokemon(record)
+        return len(records)
+    return run
+
+def use_fresh_store(directory):
+    # Point the pokemon store at an empty directory (names and types stay in memory)
+    with pokedex.POKEMON_DATA_SAVE_LOCK:
+        with pokedex.POKEMON_DATA_DB_LOCK:
+            if pokedex.POKEMON_DATA_DB is not None:
+                pokedex.POKEMON_DATA_DB.close()
+                pokedex.POKEMON_DATA_DB = None
+        pokedex.POKEMON_DATA_DIRTY.clear()
+        pokedex.POKEMON_DATA_CACHE = None
+        os.makedirs(directory)
+        os.chdir(directory)
+
+def bench_load_full_cache(fixtures, workdir):
+    rounds = iter(range(1000))
+
+    def run():
+        use_fresh_store(os.path.join(workdir, f"crawl-{next(rounds)}"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            pokedex.load_full_cache()
+        pokedex.save_all_pokemon_data()
+        os.chdir(workdir)
+        return len(fixtures['names'])
+    return run
+
+BENCHMARKS = [
+    ("find_closest_pokemon_name", bench_find_closest_pokemon_name),
+    ("search_pokemon", bench_search_pokemon),
+    ("load_cache_full_pokemon_data", bench_load_cache),
+    ("build_type_chart", bench_build_type_chart),
+    ("get_damage_multipliers", bench_damage_multipliers),
+    ("analyze_best_attack_strategy", bench_analyze_best_attack_strategy),
+    ("analyze_pokemon", bench_analyze_pokemon),
+    ("load_full_cache", bench_load_full_cache)
+]
+
+def time_rounds(run, rounds):
+    # Seconds per operation for each round, after one warm-up round
+    run()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        operations = run()
+        timings.append((time.perf_counter() - start) / operations)
+    return timings
+
+def format_duration(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def prepare_workdir(fixtures):
+    # Temporary working directory with the names and type caches in place
+    workdir = tempfile.mkdtemp(prefix="pokedex-bench-")
+    os.chdir(workdir)
+    pokedex.save_cache(pokedex.POKEMON_NAMES_CACHE_FILE, fixtures['names'])
+    pokedex.save_cache(pokedex.POKEMON_TYPES_CACHE_FILE, fixtures['types'])
+    # Measure the caches alone, never a bundled snapshot
+    pokedex.SNAPSHOT = {}
+    pokedex.load_all_type_data()
+    pokedex.load_all_pokemon_data()
+    return workdir
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for pokedex.py")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per benchmark (default: 5)")
+    parser.add_argument("--only", action="append", metavar="NAME", help="run only benchmarks containing NAME")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true", help="record the results as the new baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.5,
+        help="relative slowdown of the best round reported as a regression (default: %(default)s)"
+    )
+    args = parser.parse_args()
+    if args.save_baseline and args.rounds < MIN_COMPARE_ROUNDS:
+        parser.error(f"--save-baseline needs at least {MIN_COMPARE_ROUNDS} rounds")
+
+    fixtures = generate_fixtures()
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    comparable = (
+        baseline.get('fixtures') == {'pokemon': FIXTURE_POKEMON, 'seed': FIXTURE_SEED}
+        and baseline.get('machine') == platform.platform()
+        and baseline.get('python') == platform.python_version()
+    )
+    baseline_results = baseline.get('results', {}) if comparable and args.rounds >= MIN_COMPARE_ROUNDS else {}
+
+    workdir = prepare_workdir(fixtures)
+    results = {}
+    regressions = []
+    print(f"{'benchmark':32} {'median/op':>12} {'best/op':>12} {'base best':>12} {'change':>8}")
+    try:
+        with mock_server(fixtures, latency=SERVER_LATENCY) as base_url:
+            pokedex.POKEAPI_BASE_URL = base_url
+            for name, benchmark in BENCHMARKS:
+                if args.only and not any(part in name for part in args.only):
+                    continue
+                timings = time_rounds(benchmark(fixtures, workdir), args.rounds)
+                median = statistics.median(timings)
+                results[name] = {'median': median, 'best': min(timings)}
+
+                line = f"{name:32} {format_duration(median):>12} {format_duration(min(timings)):>12}"
+                previous = baseline_results.get(name)
+                if previous:
+                    # The best round is far less sensitive to scheduling noise than the median
+                    change = min(timings) / previous['best'] - 1
+                    line += f" {format_duration(previous['best']):>12} {change:>+7.0%}"
+                    if change > args.threshold:
+                        regressions.append(name)
+                        line += "  REGRESSION"
+                print(line)
+    finally:
+        os.chdir(BENCHMARK_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save_baseline:
+        if comparable:
+            results = {**baseline['results'], **results}
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.platform(),
+                'fixtures': {'pokemon': FIXTURE_POKEMON, 'seed': FIXTURE_SEED},
+                'results': results
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+    elif not comparable:
+        print("No baseline recorded on this machine and Python; run with --save-baseline to record one")
+    elif not baseline_results:
+        print(f"Not compared with the baseline: use at least {MIN_COMPARE_ROUNDS} rounds")
+
+    if regressions and not args.save_baseline:
+        print(f"Regressions (> {args.threshold:.0%} slower): {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
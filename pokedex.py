@@ -1,218 +1,1641 @@
-import requests
-from fuzzywuzzy import process
+import argparse
+import atexit
+import bisect
+import contextlib
+import functools
+import gzip
+import hashlib
+import importlib
+import importlib.util
+import itertools
 import json
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import asyncio
-import aiohttp
+import queue
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from types import MappingProxyType
+
+# Cross-process cache locking is POSIX-only; elsewhere writes are still atomic
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class LazyModule:
+    # Stand-in for a module that is only imported on first attribute access; the real module
+    # then replaces the stand-in in this module's globals, so later lookups cost nothing extra
+    def __init__(self, name, alias=None):
+        self._name = name
+        self._alias = alias or name
+
+    def _load(self):
+        module = importlib.import_module(self._name)
+        if globals().get(self._alias) is self:
+            globals()[self._alias] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
+
+def lazy_import(name, alias=None, optional=False):
+    # Defer importing a heavy dependency until it is used; optional ones are None when missing
+    if name in sys.modules:
+        return sys.modules[name]
+    if optional and importlib.util.find_spec(name) is None:
+        return None
+    return LazyModule(name, alias)
+
+# Heavy dependencies, only imported by the code paths that need them
+requests = lazy_import("requests")
+asyncio = lazy_import("asyncio")
+aiohttp = lazy_import("aiohttp")
+np = lazy_import("numpy", "np")
+
+# Optional faster/smaller cache serializers
+orjson = lazy_import("orjson", optional=True)
+msgpack = lazy_import("msgpack", optional=True)
+zstandard = lazy_import("zstandard", optional=True)
+
+# (extractOne provider, string preprocessor) for fuzzy matching, imported on first use
+FUZZY_MATCHER = None
+
+# PokeAPI client settings shared by every sync and async fetch; POKEAPI_BASE_URL (or --base-url)
+# points every request at another server, such as benchmarks/mock_pokeapi.py
+POKEAPI_BASE_URL = os.environ.get("POKEAPI_BASE_URL", "https://pokeapi.co/api/v2").rstrip('/')
+# (connect, read) timeouts in seconds, per request
+HTTP_TIMEOUT = (5, 15)
+HTTP_RETRIES = 3
+# Connection failures mean the API is unreachable, so they fail fast instead of backing off
+HTTP_CONNECT_RETRIES = 0
+# Retries wait HTTP_BACKOFF * 2 ** attempt seconds
+HTTP_BACKOFF = 0.5
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_POOL_SIZE = 32
+HTTP_SESSION = None
+POKEMON_NAMES_PATH = "pokemon?limit=1000"
+
+# Fetch time and validators (ETag / Last-Modified) per API path, not yet written to the store
+FETCH_META_PENDING = {}
+FETCH_META_LOCK = threading.Lock()
+
+# Crawl concurrency starts at CRAWL_INITIAL_CONCURRENCY and adapts between the bounds
+CRAWL_INITIAL_CONCURRENCY = 8
+CRAWL_MIN_CONCURRENCY = 1
+CRAWL_MAX_CONCURRENCY = 64
+# Latency above this multiple of the best observed latency counts as congestion
+CRAWL_LATENCY_TOLERANCE = 2.0
 
 # Cache setup
 CACHE_DIR = "pokemon_cache"
 POKEMON_NAMES_CACHE_FILE = os.path.join(CACHE_DIR, "pokemon_names.json")
 POKEMON_DATA_CACHE_FILE = os.path.join(CACHE_DIR, "pokemon_data.json")
+POKEMON_DATA_DB_FILE = os.path.join(CACHE_DIR, "pokemon_data.db")
 POKEMON_TYPES_CACHE_FILE = os.path.join(CACHE_DIR, "pokemon_types.json")
+TYPE_PROFILES_CACHE_FILE = os.path.join(CACHE_DIR, "pokemon_type_profiles.json")
+NEGATIVE_CACHE_FILE = os.path.join(CACHE_DIR, "negative_cache.json")
+
+# Permissions of written cache files: 0o666 minus the process umask, as open() would create
+# them, so processes of other users can share CACHE_DIR (mkstemp alone makes them owner-only)
+CACHE_FILE_UMASK = os.umask(0)
+os.umask(CACHE_FILE_UMASK)
+CACHE_FILE_MODE = 0o666 & ~CACHE_FILE_UMASK
+
+# Serialization per cache file: "<json|orjson|msgpack>[+<gzip|zstd>]". load_cache detects the
+# format from the file contents, so changing this only affects the next write
+CACHE_FORMATS = {
+    POKEMON_NAMES_CACHE_FILE: "json",
+    POKEMON_TYPES_CACHE_FILE: "json+gzip",
+    TYPE_PROFILES_CACHE_FILE: "json+gzip",
+    NEGATIVE_CACHE_FILE: "json"
+}
+# Format for raw payloads kept in the store when STORE_RAW_PAYLOADS is on
+RAW_PAYLOAD_FORMAT = "json+gzip"
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+# Prefix of msgpack cache data, so anything unmarked is parsed (and rejected) as JSON
+MSGPACK_MAGIC = b'MSGPACK\x00'
 
 # Store pokemon names to avoid repeated API calls
 POKEMON_NAMES_CACHE = None
+# When the names list last failed to download; no new attempt for NAMES_RETRY_INTERVAL seconds
+POKEMON_NAMES_FAILED_AT = None
+NAMES_RETRY_INTERVAL = 60
 POKEMON_DATA_CACHE = None
 POKEMON_TYPES_CACHE = None
+# Pokemon keys PokeAPI answered 404 for, with the time (epoch seconds) the entry expires; an
+# LRUCache, since in server mode every name a client sends can add an entry
+NEGATIVE_CACHE = None
+NEGATIVE_CACHE_DIRTY = False
+NEGATIVE_CACHE_TTL = 24 * 60 * 60
+# Entries kept in memory and in NEGATIVE_CACHE_FILE
+NEGATIVE_CACHE_MAX_ENTRIES = 4096
+
+# (name list, name set, trigram -> name indices) for fuzzy name resolution
+NAME_INDEX = None
+FUZZY_MATCH_THRESHOLD = 80
+# How many trigram-overlap candidates get full fuzzy scoring
+FUZZY_CANDIDATE_LIMIT = 50
+
+# (name list, {form group: suffix index}) for search_pokemon
+SEARCH_INDEXES = None
+
+# Base Pokémon with mega, Gigantamax and regional forms
+MEGA_CAPABLE = [
+    'venusaur', 'charizard', 'blastoise', 'alakazam', 'gengar',
+    'kangaskhan', 'pinsir', 'gyarados', 'aerodactyl', 'mewtwo',
+    'ampharos', 'scizor', 'heracross', 'houndoom', 'tyranitar',
+    'blaziken', 'gardevoir', 'mawile', 'aggron', 'medicham',
+    'manectric', 'banette', 'absol', 'garchomp', 'lucario',
+    'abomasnow', 'beedrill', 'pidgeot', 'slowbro', 'steelix',
+    'sceptile', 'swampert', 'sableye', 'sharpedo', 'camerupt',
+    'altaria', 'glalie', 'salamence', 'metagross', 'latias',
+    'latios', 'rayquaza', 'lopunny', 'gallade', 'audino',
+    'diancie'
+]
+GMAX_CAPABLE = [
+    'venusaur', 'charizard', 'blastoise', 'butterfree', 'pikachu',
+    'meowth', 'machamp', 'gengar', 'kingler', 'lapras',
+    'eevee', 'snorlax', 'garbodor', 'corviknight', 'orbeetle',
+    'drednaw', 'coalossal', 'flapple', 'appletun', 'sandaconda',
+    'toxtricity', 'centiskorch', 'hatterene', 'grimmsnarl',
+    'alcremie', 'copperajah', 'duraludon', 'urshifu', 'calyrex'
+]
+REGIONAL_PREFIXES = {
+    'alolan ': 'alola',
+    'galarian ': 'galar',
+    'hisuian ': 'hisui',
+    'paldean ': 'paldea'
+}
+REGIONAL_VARIANTS = {
+    'alola': ['rattata', 'raticate', 'raichu', 'sandshrew', 'sandslash',
+             'vulpix', 'ninetales', 'diglett', 'dugtrio', 'meowth',
+             'persian', 'geodude', 'graveler', 'golem', 'grimer',
+             'muk', 'exeggutor', 'marowak', 'cubone', 'kangaskhan'],
+    'galar': ['meowth', 'persian', 'ponyta', 'rapidash', 'farfetchd',
+             'weezing', 'mr-mime', 'articuno', 'zapdos', 'moltres',
+             'slowpoke', 'slowbro', 'slowking', 'corsola', 'zigzagoon',
+             'linoone', 'darumaka', 'darmanitan', 'yamask', 'stunfisk',
+             'basculin', 'zorua', 'zoroark', 'tornadus', 'thundurus',
+             'landorus', 'enamorus'],
+    'hisui': ['growlithe', 'arcanine', 'voltorb', 'electrode', 'typhlosion',
+             'qwilfish', 'sneasel', 'samurott', 'lilligant', 'basculin',
+             'zorua', 'zoroark', 'braviary', 'sliggoo', 'goodra',
+             'avalugg', 'decidueye'],
+    'paldea': ['tauros', 'wooper', 'mimikyu']
+}
+
+# On-disk pokemon store, read on demand; POKEMON_DATA_CACHE only holds entries used this session
+POKEMON_DATA_DB = None
+# Bounds for POKEMON_DATA_CACHE (None for no limit); least recently used entries are dropped
+# once either is exceeded and are read back from the store when needed again
+POKEMON_CACHE_MAX_ENTRIES = 2048
+POKEMON_CACHE_MAX_BYTES = None
+POKEMON_DATA_DB_LOCK = threading.Lock()
+# Keys added to POKEMON_DATA_CACHE that are not yet written to the store
+POKEMON_DATA_DIRTY = set()
+# Pending async fetches by pokemon key, so concurrent lookups share one request
+POKEMON_IN_FLIGHT = {}
+# load_full_cache writes completed entries to the store every this many pokemon
+CHECKPOINT_BATCH_SIZE = 50
+# Also keep full PokeAPI payloads (in a separate table) alongside the slim records
+STORE_RAW_PAYLOADS = False
+POKEMON_RAW_PENDING = {}
+# Guards POKEMON_DATA_DIRTY / POKEMON_RAW_PENDING updates; saves themselves are serialized
+POKEMON_DATA_DIRTY_LOCK = threading.Lock()
+POKEMON_DATA_SAVE_LOCK = threading.Lock()
+# Write-behind: newly cached pokemon are saved by a background thread, batching whatever
+# arrives within WRITE_BEHIND_DELAY seconds (up to WRITE_BEHIND_BATCH_SIZE keys per save)
+WRITE_BEHIND_DELAY = 1.0
+WRITE_BEHIND_BATCH_SIZE = 50
+WRITE_BEHIND_QUEUE = queue.Queue()
+WRITE_BEHIND_THREAD = None
+
+# All attacking/defending types, in type chart order
+TYPE_NAMES = [
+    "normal", "fire", "water", "electric", "grass", "ice", "fighting", "poison",
+    "ground", "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy"
+]
+TYPE_INDEX = {type_name: i for i, type_name in enumerate(TYPE_NAMES)}
+# PokeAPI type ids start at 1 in this order, which is also the order its damage relations list
+# types in; multipliers are listed (and ties broken) in this order
+POKEAPI_TYPE_ORDER = [
+    "normal", "fighting", "flying", "poison", "ground", "rock", "bug", "ghost", "steel",
+    "fire", "water", "grass", "electric", "psychic", "ice", "dragon", "dark", "fairy"
+]
+POKEAPI_TYPE_RANK = {type_name: i for i, type_name in enumerate(POKEAPI_TYPE_ORDER)}
+POKEAPI_TYPE_INDICES = [TYPE_INDEX[type_name] for type_name in POKEAPI_TYPE_ORDER]
+
+# TYPE_CHART[attacking, defending] -> damage multiplier, built from POKEMON_TYPES_CACHE
+TYPE_CHART = None
+# Type data fetched since POKEMON_TYPES_CACHE was last saved
+POKEMON_TYPES_DIRTY = False
+# Background thread fetching missing type data, if one was started
+TYPE_DATA_LOADER = None
+# Defensive multiplier vectors keyed by sorted typing tuple
+TYPE_PROFILE_CACHE = {}
+# (multipliers, multiplier groups) for all 171 single and dual typings keyed by sorted typing
+# tuple, precomputed whenever the chart covers every type
+TYPE_PROFILES = {}
+# Bumped whenever the persisted profile table's layout or ordering changes
+TYPE_PROFILES_VERSION = 3
+# (cache key, pokemon names, pokemon x attacking-type multiplier matrix)
+MATCHUP_MATRIX_CACHE = None
+# Multiplier buckets used to group type effectiveness, strongest first
+MULTIPLIER_BUCKETS = (4, 2, 1, 0.5, 0.25, 0)
+# PokemonAnalysis results keyed by (sorted typing, defense, special defense)
+ANALYSIS_CACHE = {}
+
+# Offline snapshot (names, type chart, slim records) shipped next to this file and built with
+# --build-snapshot; local caches and the network are only used for what it lacks
+SNAPSHOT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pokedex_snapshot.json.gz")
+SNAPSHOT_VERSION = 1
+# Loaded snapshot, {} when there is none (or it is from an incompatible version)
+SNAPSHOT = None
+
+# HTTP server mode (--serve): successful responses are cached for SERVER_CACHE_TTL seconds,
+# keeping at most SERVER_CACHE_SIZE of them (least recently used are dropped first)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+SERVER_CACHE_TTL = 300
+SERVER_CACHE_SIZE = 1024
+
+class PokemonRecord:
+    # Slim projection of a /pokemon/{id} payload holding only the fields the analysis reads
+    __slots__ = ('name', 'id', 'types', 'stats')
+
+    def __init__(self, name, id, types, stats):
+        self.name = name
+        self.id = id
+        # Type names in slot order and (stat name, base stat) pairs in API order
+        self.types = tuple(types)
+        self.stats = tuple((stat_name, base_stat) for stat_name, base_stat in stats)
+
+    @classmethod
+    def from_api(cls, data):
+        # Project a raw PokeAPI payload
+        return cls(
+            data['name'],
+            data['id'],
+            [t['type']['name'] for t in sorted(data['types'], key=lambda t: t.get('slot', 0))],
+            [(stat['stat']['name'], stat['base_stat']) for stat in data['stats']]
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        # Rebuild from to_dict() output, or project a raw payload from an older cache
+        if data['types'] and isinstance(data['types'][0], dict):
+            return cls.from_api(data)
+        return cls(data['name'], data['id'], data['types'], data['stats'].items())
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'id': self.id,
+            'types': list(self.types),
+            'stats': dict(self.stats)
+        }
+
+    def get_stat(self, stat_name, default=0):
+        for name, base_stat in self.stats:
+            if name == stat_name:
+                return base_stat
+        return default
+
+    def approximate_size(self):
+        # Rough bytes held by the record, its tuples and their contents
+        size = sys.getsizeof(self) + sys.getsizeof(self.name) + sys.getsizeof(self.id)
+        size += sys.getsizeof(self.types) + sum(sys.getsizeof(t) for t in self.types)
+        size += sys.getsizeof(self.stats) + sum(
+            sys.getsizeof(pair) + sys.getsizeof(pair[0]) + sys.getsizeof(pair[1]) for pair in self.stats
+        )
+        return size
+
+    def __eq__(self, other):
+        if not isinstance(other, PokemonRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"PokemonRecord(name={self.name!r}, id={self.id!r}, types={self.types!r})"
+
+class LRUCache:
+    # Mapping that drops its least recently used entries once it holds more than max_entries
+    # entries or roughly max_bytes bytes (as measured by sizeof). Keys for which pinned(key)
+    # is true are skipped by eviction until trim() runs after they are unpinned
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=sys.getsizeof, pinned=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.pinned = pinned
+        self.total_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = self._entries[key]
+            self._entries.move_to_end(key)
+            return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries[key]
+            self._remove(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = value
+            self._sizes[key] = self.sizeof(value) if self.max_bytes is not None else 0
+            self.total_bytes += self._sizes[key]
+            self.trim()
+
+    def __delitem__(self, key):
+        with self._lock:
+            if key not in self._entries:
+                raise KeyError(key)
+            self._remove(key)
+
+    def _remove(self, key):
+        del self._entries[key]
+        self.total_bytes -= self._sizes.pop(key)
+
+    def values(self):
+        return list(self._entries.values())
+
+    def items(self):
+        return list(self._entries.items())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.total_bytes = 0
+
+    def over_limit(self):
+        return (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        )
+
+    def trim(self):
+        # Evict from the least recently used end; pinned entries are moved to the other end
+        with self._lock:
+            skipped = 0
+            while self.over_limit() and skipped < len(self._entries):
+                key = next(iter(self._entries))
+                if self.pinned and self.pinned(key):
+                    self._entries.move_to_end(key)
+                    skipped += 1
+                    continue
+                self._remove(key)
+                self.evictions += 1
+
+class PokemonAnalysis:
+    # Type matchup analysis for one typing and defense spread; a result is shared by every
+    # pokemon with the same key, so its fields are read-only
+    __slots__ = ('types', 'defense', 'sp_defense', 'multipliers', 'groups', 'strategy')
+
+    def __init__(self, types, defense, sp_defense, multipliers, groups, strategy):
+        self.types = tuple(types)
+        self.defense = defense
+        self.sp_defense = sp_defense
+        # Non-neutral multipliers by attacking type, and attacking types by multiplier bucket
+        self.multipliers = MappingProxyType(dict(multipliers))
+        self.groups = MappingProxyType({bucket: tuple(names) for bucket, names in groups.items()})
+        # analyze_best_attack_strategy output, with its lists frozen to tuples
+        self.strategy = MappingProxyType({
+            key: tuple(value) if isinstance(value, list) else value
+            for key, value in strategy.items()
+        })
+
+    def to_dict(self):
+        return {
+            'types': list(self.types),
+            'multipliers': dict(self.multipliers),
+            'groups': {bucket: list(names) for bucket, names in self.groups.items()},
+            'strategy': {
+                key: list(value) if isinstance(value, tuple) else value
+                for key, value in self.strategy.items()
+            }
+        }
+
+    def __reduce__(self):
+        # Mapping proxies can't be pickled; rebuild from plain dicts so results can be
+        # cached on disk or sent to other processes
+        return (PokemonAnalysis, (
+            self.types, self.defense, self.sp_defense,
+            dict(self.multipliers), dict(self.groups), dict(self.strategy)
+        ))
+
+    def __repr__(self):
+        return (
+            f"PokemonAnalysis(types={self.types!r}, defense={self.defense!r}, "
+            f"sp_defense={self.sp_defense!r})"
+        )
+
+def api_url(path):
+    # Absolute PokeAPI URL for a path such as "pokemon/25" (absolute URLs pass through)
+    if path.startswith(('http://', 'https://')):
+        return path
+    return f"{POKEAPI_BASE_URL}/{path.lstrip('/')}"
+
+def api_path(path):
+    # Normalized API path ("type/fire") used as the fetch metadata key
+    if path.startswith(POKEAPI_BASE_URL):
+        path = path[len(POKEAPI_BASE_URL):]
+    return path.strip('/')
+
+def record_fetch(path, headers):
+    # Remember when an API path was fetched or revalidated, with its cache validators
+    with FETCH_META_LOCK:
+        FETCH_META_PENDING[api_path(path)] = (time.time(), headers.get('ETag'), headers.get('Last-Modified'))
+
+def get_http_session():
+    # Shared requests session with keep-alive connection pooling and retry/backoff
+    global HTTP_SESSION
+    if HTTP_SESSION is None:
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        retry = Retry(
+            total=HTTP_RETRIES,
+            connect=HTTP_CONNECT_RETRIES,
+            backoff_factor=HTTP_BACKOFF,
+            status_forcelist=HTTP_RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        HTTP_SESSION = session
+    return HTTP_SESSION
+
+def api_get_json(path):
+    # GET a PokeAPI path through the shared session; raises on network errors and non-200s
+    response = get_http_session().get(api_url(path), timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    record_fetch(path, response.headers)
+    return data
+
+def create_async_session(limit=HTTP_POOL_SIZE):
+    # aiohttp session with the same pool size and per-request timeouts as the sync client
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=limit),
+        timeout=aiohttp.ClientTimeout(total=None, sock_connect=HTTP_TIMEOUT[0], sock_read=HTTP_TIMEOUT[1])
+    )
+
+def backoff_delay(attempt):
+    # Full-jitter exponential backoff so retrying clients don't synchronize
+    return random.uniform(0, HTTP_BACKOFF * 2 ** attempt)
+
+def parse_retry_after(value):
+    # Seconds from a Retry-After header (HTTP-date values are ignored)
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+async def fetch_json_once(session, path, headers=None):
+    # Single GET attempt: (status, json, retry_after); status is None on network errors
+    try:
+        async with session.get(api_url(path), headers=headers) as response:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status == 304:
+                record_fetch(path, response.headers)
+            if response.status != 200:
+                return response.status, None, retry_after
+            data = await response.json()
+            record_fetch(path, response.headers)
+            return response.status, data, retry_after
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None, None, None
+
+async def fetch_json_status(session, path):
+    # GET a PokeAPI path with aiohttp, retrying transient failures; returns (status, JSON or None).
+    # Network errors get only HTTP_CONNECT_RETRIES retries, like the sync session, so an
+    # unreachable API fails fast (the crawler's adaptive fetch keeps retrying them)
+    network_failures = 0
+    for attempt in range(HTTP_RETRIES + 1):
+        status, data, retry_after = await fetch_json_once(session, path)
+        if status == 200:
+            return status, data
+        if status is not None and status not in HTTP_RETRY_STATUSES:
+            return status, None
+        if status is None:
+            network_failures += 1
+            if network_failures > HTTP_CONNECT_RETRIES:
+                return status, None
+        if attempt < HTTP_RETRIES:
+            await asyncio.sleep(max(backoff_delay(attempt), retry_after or 0))
+    return status, None
+
+async def fetch_json(session, path):
+    # Like fetch_json_status, returning only the JSON or None
+    _, data = await fetch_json_status(session, path)
+    return data
+
+class AdaptiveLimiter:
+    # AIMD concurrency limit: grows while latency stays close to the best seen,
+    # halves on 429/5xx/network errors and pauses new requests for Retry-After
+    def __init__(self, initial=CRAWL_INITIAL_CONCURRENCY, minimum=CRAWL_MIN_CONCURRENCY,
+                 maximum=CRAWL_MAX_CONCURRENCY):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        # Requests to complete before another decrease, so one burst of errors halves only once
+        self.hold_decrease = 0
+        self.best_latency = None
+        self.resume_at = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        delay = self.resume_at - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self, latency=None, throttled=False, retry_after=None):
+        async with self._condition:
+            self.in_flight -= 1
+            self.hold_decrease = max(0, self.hold_decrease - 1)
+            if throttled:
+                if not self.hold_decrease:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self.hold_decrease = self.in_flight + 1
+                if retry_after:
+                    now = asyncio.get_running_loop().time()
+                    self.resume_at = max(self.resume_at, now + retry_after)
+            elif latency is not None:
+                if self.best_latency is None or latency < self.best_latency:
+                    self.best_latency = latency
+                if latency <= self.best_latency * CRAWL_LATENCY_TOLERANCE:
+                    # Roughly +1 per limit's worth of successful requests
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                elif not self.hold_decrease:
+                    self.limit = max(self.minimum, self.limit * 0.9)
+                    self.hold_decrease = self.in_flight + 1
+            self._condition.notify_all()
+
+async def fetch_json_adaptive(session, path, limiter, headers=None):
+    # fetch_json variant that reports every attempt to the limiter; returns (status, json)
+    loop = asyncio.get_running_loop()
+    status = None
+    for attempt in range(HTTP_RETRIES + 1):
+        await limiter.acquire()
+        started = loop.time()
+        status, data, retry_after = None, None, None
+        try:
+            status, data, retry_after = await fetch_json_once(session, path, headers)
+        finally:
+            throttled = status is None or status in HTTP_RETRY_STATUSES
+            latency = loop.time() - started if status in (200, 304) else None
+            await limiter.release(latency, throttled, retry_after)
+        if not throttled:
+            return status, data
+        if attempt < HTTP_RETRIES:
+            await asyncio.sleep(backoff_delay(attempt))
+    return status, None
+
+async def crawl_json(session, keys, path_format, limiter=None, headers_for=None):
+    # Stream (key, status, json or None) for every key as requests complete, using a fixed
+    # pool of workers gated by an AdaptiveLimiter instead of one task per key
+    limiter = limiter or AdaptiveLimiter()
+    pending_keys = iter(keys)
+    results = asyncio.Queue(maxsize=limiter.maximum)
+
+    async def worker():
+        try:
+            for key in pending_keys:
+                headers = headers_for(key) if headers_for else None
+                status, data = await fetch_json_adaptive(session, path_format.format(key), limiter, headers)
+                await results.put((key, status, data))
+        finally:
+            await results.put(None)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(limiter.maximum)]
+    try:
+        remaining_workers = len(workers)
+        while remaining_workers:
+            item = await results.get()
+            if item is None:
+                remaining_workers -= 1
+            else:
+                yield item
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
 
 def ensure_cache_dir():
     # Create cache directory if missing
     if not os.path.exists(CACHE_DIR):
         os.makedirs(CACHE_DIR)
 
+@contextlib.contextmanager
+def cache_lock(file_path):
+    # Exclusive lock on a cache file shared by every process using the same CACHE_DIR
+    ensure_cache_dir()
+    with open(file_path + '.lock', 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def encode_cache_data(data, cache_format="json"):
+    # Serialize (and optionally compress) cache data to bytes
+    serializer, _, compression = cache_format.partition('+')
+    if serializer == 'json':
+        encoded = json.dumps(data).encode('utf-8')
+    elif serializer == 'orjson':
+        if orjson is None:
+            raise ValueError("orjson is not installed")
+        encoded = orjson.dumps(data)
+    elif serializer == 'msgpack':
+        if msgpack is None:
+            raise ValueError("msgpack is not installed")
+        encoded = MSGPACK_MAGIC + msgpack.packb(data, use_bin_type=True)
+    else:
+        raise ValueError(f"Unknown cache serializer: {serializer}")
+
+    if compression == 'gzip':
+        return gzip.compress(encoded, compresslevel=6)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstandard is not installed")
+        return zstandard.ZstdCompressor().compress(encoded)
+    if compression:
+        raise ValueError(f"Unknown cache compression: {compression}")
+    return encoded
+
+def decode_cache_data(encoded):
+    # Inverse of encode_cache_data for any format, detected from the bytes themselves
+    if isinstance(encoded, str):
+        return json.loads(encoded)
+    try:
+        if encoded.startswith(GZIP_MAGIC):
+            encoded = gzip.decompress(encoded)
+        elif encoded.startswith(ZSTD_MAGIC):
+            if zstandard is None:
+                raise ValueError("zstandard is not installed")
+            encoded = zstandard.ZstdDecompressor().decompress(encoded)
+    except ValueError:
+        raise
+    except Exception as e:
+        # gzip raises OSError/EOFError, zstandard raises ZstdError
+        raise ValueError(f"Bad compressed cache data: {e}")
+
+    if encoded.startswith(MSGPACK_MAGIC):
+        if msgpack is None:
+            raise ValueError("msgpack is not installed")
+        return msgpack.unpackb(encoded[len(MSGPACK_MAGIC):], raw=False)
+    return orjson.loads(encoded) if orjson else json.loads(encoded)
+
 def load_cache(file_path):
-    # Load data from cache file
-    if os.path.exists(file_path):
+    # Load data from cache file in any supported format; a corrupt file is moved aside
+    if not os.path.exists(file_path):
+        return None
+    try:
+        with open(file_path, 'rb') as f:
+            data = decode_cache_data(f.read())
+        # Every cache file holds a dict or a list; anything else is garbage that happened to parse
+        if not isinstance(data, (dict, list)):
+            raise ValueError(f"expected a dict or list, got {type(data).__name__}")
+        return data
+    except ValueError as e:
+        print(f"Ignoring corrupt cache file {file_path}: {e}", file=sys.stderr)
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        except:
-            return None
+            os.replace(file_path, file_path + '.corrupt')
+        except OSError:
+            pass
+    except OSError as e:
+        print(f"Could not read cache file {file_path}: {e}", file=sys.stderr)
     return None
 
-def save_cache(file_path, data):
-    # Save data to cache file
+def save_cache(file_path, data, merge=False, cache_format=None):
+    # Atomically replace a cache file (temp file + rename) under the cache lock;
+    # with merge=True, dict entries other processes wrote in the meantime are kept, and
+    # merge may also be a function (existing, data) -> merged dict
     ensure_cache_dir()
-    with open(file_path, 'w') as f:
-        json.dump(data, f)
+    with cache_lock(file_path):
+        if merge and isinstance(data, dict):
+            existing = load_cache(file_path)
+            if isinstance(existing, dict):
+                if callable(merge):
+                    data = merge(existing, data)
+                else:
+                    existing.update(data)
+                    data = existing
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(file_path) or '.',
+            prefix=os.path.basename(file_path) + '.',
+            suffix='.tmp'
+        )
+        try:
+            encoded = encode_cache_data(data, cache_format or CACHE_FORMATS.get(file_path, "json"))
+            if hasattr(os, 'fchmod'):
+                os.fchmod(fd, CACHE_FILE_MODE)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encoded)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    return data
+
+def migrate_cache(file_path, cache_format):
+    # Rewrite an existing cache file in another format and use that format from now on
+    data = load_cache(file_path)
+    CACHE_FORMATS[file_path] = cache_format
+    if data is not None:
+        save_cache(file_path, data, cache_format=cache_format)
+    return data is not None
+
+def save_type_data():
+    # Write POKEMON_TYPES_CACHE once for a whole batch of fetched types
+    global POKEMON_TYPES_DIRTY
+    merged = save_cache(POKEMON_TYPES_CACHE_FILE, POKEMON_TYPES_CACHE, merge=True)
+    # Pick up types other processes fetched
+    for type_name, data in merged.items():
+        POKEMON_TYPES_CACHE.setdefault(type_name, data)
+    POKEMON_TYPES_DIRTY = False
+    flush_fetch_metadata()
+
+def flush_caches():
+    # Write anything still pending; also runs at interpreter exit
+    if POKEMON_TYPES_DIRTY and POKEMON_TYPES_CACHE:
+        save_type_data()
+    if POKEMON_DATA_DIRTY or POKEMON_RAW_PENDING:
+        save_all_pokemon_data()
+    if NEGATIVE_CACHE_DIRTY:
+        save_negative_cache()
+    if FETCH_META_PENDING:
+        flush_fetch_metadata()
 
 def clear_cache():
     # Clear all cache files
-    if os.path.exists(POKEMON_NAMES_CACHE_FILE):
-        os.remove(POKEMON_NAMES_CACHE_FILE)
-    if os.path.exists(POKEMON_DATA_CACHE_FILE):
-        os.remove(POKEMON_DATA_CACHE_FILE)
-    if os.path.exists(POKEMON_TYPES_CACHE_FILE):
-        os.remove(POKEMON_TYPES_CACHE_FILE)
+    global POKEMON_DATA_DB, NEGATIVE_CACHE
+    with POKEMON_DATA_DB_LOCK:
+        if POKEMON_DATA_DB is not None:
+            POKEMON_DATA_DB.close()
+            POKEMON_DATA_DB = None
+    cache_files = [
+        POKEMON_DATA_DB_FILE, POKEMON_NAMES_CACHE_FILE, POKEMON_DATA_CACHE_FILE,
+        POKEMON_TYPES_CACHE_FILE, TYPE_PROFILES_CACHE_FILE, NEGATIVE_CACHE_FILE
+    ]
+    # Each file along with the lock file cache_lock created for it
+    for file_path in cache_files + [file_path + '.lock' for file_path in cache_files]:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    NEGATIVE_CACHE = None
     print("Cache cleared")
 
+def prune_negative_entries(entries):
+    # Unexpired entries, at most NEGATIVE_CACHE_MAX_ENTRIES of them (those expiring last),
+    # ordered by expiry time
+    now = time.time()
+    live = sorted((item for item in entries.items() if item[1] > now), key=lambda item: item[1])
+    return dict(live[-NEGATIVE_CACHE_MAX_ENTRIES:])
+
+def load_negative_cache():
+    # Known-missing pokemon keys, loaded once and without expired entries
+    global NEGATIVE_CACHE
+    if NEGATIVE_CACHE is None:
+        cached = load_cache(NEGATIVE_CACHE_FILE)
+        NEGATIVE_CACHE = LRUCache(max_entries=NEGATIVE_CACHE_MAX_ENTRIES)
+        # Soonest-expiring entries first, so they are evicted first
+        for key, expires_at in prune_negative_entries(cached if isinstance(cached, dict) else {}).items():
+            NEGATIVE_CACHE[key] = expires_at
+    return NEGATIVE_CACHE
+
+def merge_negative_entries(existing, entries):
+    # save_cache merge for NEGATIVE_CACHE_FILE: the later expiry wins, then pruned
+    merged = dict(existing)
+    for key, expires_at in entries.items():
+        if not isinstance(merged.get(key), (int, float)) or expires_at > merged[key]:
+            merged[key] = expires_at
+    return prune_negative_entries({k: v for k, v in merged.items() if isinstance(v, (int, float))})
+
+def save_negative_cache():
+    # Merge with entries other processes recorded, dropping expired ones and the excess
+    global NEGATIVE_CACHE_DIRTY
+    negative_cache = load_negative_cache()
+    merged = save_cache(
+        NEGATIVE_CACHE_FILE, prune_negative_entries(dict(negative_cache.items())), merge=merge_negative_entries
+    )
+    for key, expires_at in merged.items():
+        if key not in negative_cache:
+            negative_cache[key] = expires_at
+    NEGATIVE_CACHE_DIRTY = False
+
+def is_known_missing(pokemon_key):
+    # Whether PokeAPI answered 404 for this key within NEGATIVE_CACHE_TTL
+    expires_at = load_negative_cache().get(pokemon_key)
+    if expires_at is None:
+        return False
+    if expires_at > time.time():
+        return True
+    NEGATIVE_CACHE.pop(pokemon_key, None)
+    return False
+
+def remember_missing(pokemon_key):
+    # Record a 404 so the key is rejected locally until the entry expires
+    global NEGATIVE_CACHE_DIRTY
+    load_negative_cache()[pokemon_key] = time.time() + NEGATIVE_CACHE_TTL
+    NEGATIVE_CACHE_DIRTY = True
+
+def load_snapshot(file_path=None):
+    # Load the bundled offline snapshot once; it is read-only, so a bad file is just ignored
+    global SNAPSHOT
+    if SNAPSHOT is not None and file_path is None:
+        return SNAPSHOT
+    file_path = file_path or SNAPSHOT_FILE
+    SNAPSHOT = {}
+    if not os.path.exists(file_path):
+        return SNAPSHOT
+    try:
+        with open(file_path, 'rb') as f:
+            data = decode_cache_data(f.read())
+    except (OSError, ValueError) as e:
+        print(f"Ignoring snapshot {file_path}: {e}", file=sys.stderr)
+        return SNAPSHOT
+    if not isinstance(data, dict) or data.get('version') != SNAPSHOT_VERSION or data.get('type_names') != TYPE_NAMES:
+        print(f"Ignoring snapshot {file_path}: built for a different version", file=sys.stderr)
+        return SNAPSHOT
+
+    type_chart = np.array(data['type_chart'], dtype=float)
+    type_chart.flags.writeable = False
+    # Records stay as plain dicts until looked up, so loading stays a single decode
+    records = data['records']
+    SNAPSHOT = {
+        'created': data.get('created'),
+        'names': data['names'],
+        'type_chart': type_chart,
+        'records': records,
+        'ids': {str(record['id']): name for name, record in records.items()}
+    }
+    return SNAPSHOT
+
+def snapshot_covers_type(type_name):
+    # Whether the snapshot's type chart can stand in for fetched type data
+    return 'type_chart' in load_snapshot() and type_name in TYPE_INDEX
+
+def get_snapshot_pokemon(pokemon_key):
+    # Slim record for a resolved key (name or ID) from the snapshot, if it has one
+    snapshot = load_snapshot()
+    if not snapshot:
+        return None
+    record = snapshot['records'].get(pokemon_key) or snapshot['records'].get(snapshot['ids'].get(pokemon_key))
+    return PokemonRecord.from_dict(record) if record else None
+
 def get_all_pokemon_names():
-    global POKEMON_NAMES_CACHE
+    global POKEMON_NAMES_CACHE, POKEMON_NAMES_FAILED_AT
     
-    # Load from cache first
-    if POKEMON_NAMES_CACHE is None:
-        cache_data = load_cache(POKEMON_NAMES_CACHE_FILE)
-        if cache_data:
-            POKEMON_NAMES_CACHE = cache_data
-            return POKEMON_NAMES_CACHE, "cache"
-
-    # Fetch from API if cache missing
+    # Use the in-memory list, then the cache file
+    if POKEMON_NAMES_CACHE is not None:
+        return POKEMON_NAMES_CACHE, "cache"
+    cache_data = load_cache(POKEMON_NAMES_CACHE_FILE)
+    if cache_data:
+        POKEMON_NAMES_CACHE = cache_data
+        return POKEMON_NAMES_CACHE, "cache"
+    snapshot = load_snapshot()
+    if snapshot:
+        POKEMON_NAMES_CACHE = snapshot['names']
+        return POKEMON_NAMES_CACHE, "snapshot"
+
+    # Fetch from API if cache missing, unless it just failed (offline lookups stay fast)
+    if POKEMON_NAMES_FAILED_AT is not None and time.time() - POKEMON_NAMES_FAILED_AT < NAMES_RETRY_INTERVAL:
+        return [], "error"
     try:
-        response = requests.get("https://pokeapi.co/api/v2/pokemon?limit=1000")
-        data = response.json()
+        data = api_get_json(POKEMON_NAMES_PATH)
         POKEMON_NAMES_CACHE = [pokemon['name'] for pokemon in data['results']]
         save_cache(POKEMON_NAMES_CACHE_FILE, POKEMON_NAMES_CACHE)
+        flush_fetch_metadata()
         return POKEMON_NAMES_CACHE, "api"
     except:
         if POKEMON_NAMES_CACHE is None:
             cache_data = load_cache(POKEMON_NAMES_CACHE_FILE)
             if cache_data:
-                print("Using cached list")
+                print("Using cached list", file=sys.stderr)
                 POKEMON_NAMES_CACHE = cache_data
                 return POKEMON_NAMES_CACHE, "cache"
             else:
+                POKEMON_NAMES_FAILED_AT = time.time()
                 return [], "error"
     return POKEMON_NAMES_CACHE, "cache"
 
+def name_trigrams(name):
+    # Trigrams of a name, padded so short names and word starts still produce some
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def build_name_index(pokemon_names):
+    # Build the trigram index used to prefilter fuzzy matching candidates
+    global NAME_INDEX
+    postings = {}
+    for i, name in enumerate(pokemon_names):
+        for gram in name_trigrams(name):
+            postings.setdefault(gram, []).append(i)
+    NAME_INDEX = (pokemon_names, frozenset(pokemon_names), postings)
+    resolve_pokemon_name.cache_clear()
+
+def get_fuzzy_matcher():
+    # Prefer rapidfuzz (same scores, much faster) and fall back to fuzzywuzzy
+    global FUZZY_MATCHER
+    if FUZZY_MATCHER is None:
+        try:
+            from rapidfuzz import process
+            from rapidfuzz.utils import default_process as fuzzy_processor
+        except ImportError:
+            from fuzzywuzzy import process
+            from fuzzywuzzy.utils import full_process as fuzzy_processor
+        FUZZY_MATCHER = (process, fuzzy_processor)
+    return FUZZY_MATCHER
+
+@functools.lru_cache(maxsize=2048)
+def resolve_pokemon_name(query):
+    # Resolve a lowercased query against NAME_INDEX; results are cached until the index is rebuilt
+    pokemon_names, name_set, postings = NAME_INDEX
+    if query in name_set:
+        return query
+
+    # Only score the names sharing the most trigrams with the query, plus every name that may
+    # contain it (those tie on partial matches), kept in name-list order so score ties resolve
+    # as a full-list scan would. Short queries and queries without any shared trigram are
+    # scored against every name
+    candidates = pokemon_names
+    if len(query) >= 3:
+        overlap = Counter()
+        for gram in name_trigrams(query):
+            for i in postings.get(gram, ()):
+                overlap[i] += 1
+        if overlap:
+            selected = {i for i, _ in overlap.most_common(FUZZY_CANDIDATE_LIMIT)}
+            selected.update(set.intersection(*(
+                set(postings.get(query[i:i + 3], ())) for i in range(len(query) - 2)
+            )))
+            candidates = [pokemon_names[i] for i in sorted(selected)]
+
+    process, fuzzy_processor = get_fuzzy_matcher()
+    result = process.extractOne(query, candidates, processor=fuzzy_processor)
+    if result and result[1] >= FUZZY_MATCH_THRESHOLD:
+        return result[0]
+    return None
+
 def find_closest_pokemon_name(input_name):
     # Find closest matching pokemon name using fuzzy matching
     pokemon_names, _ = get_all_pokemon_names()
     if not pokemon_names:
         return None
-    
-    # Check exact match first
-    if input_name.lower() in pokemon_names:
-        return input_name.lower()
-    
-    # Use fuzzy matching for close matches
-    result = process.extractOne(input_name.lower(), pokemon_names)
-    if result and result[1] >= 80:
-        return result[0]
-    return None
+    if NAME_INDEX is None or NAME_INDEX[0] is not pokemon_names:
+        build_name_index(pokemon_names)
+    return resolve_pokemon_name(input_name.lower())
 
-def load_all_type_data():
-    global POKEMON_TYPES_CACHE
+def load_all_type_data(background=False, fetch_missing=True):
+    # Load cached type data and fetch any missing types concurrently, optionally in a
+    # background thread so the caller can continue immediately; fetch_missing=False only
+    # loads the cache, for callers that fetch the gaps with their own session
+    global POKEMON_TYPES_CACHE, TYPE_DATA_LOADER
     POKEMON_TYPES_CACHE = load_cache(POKEMON_TYPES_CACHE_FILE) or {}
-    type_names = [
-        "normal", "fire", "water", "electric", "grass", "ice", "fighting", "poison",
-        "ground", "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy"
+    build_type_chart()
+    missing_types = [t for t in TYPE_NAMES if t not in POKEMON_TYPES_CACHE and not snapshot_covers_type(t)]
+    if not missing_types or not fetch_missing:
+        return
+    if background:
+        TYPE_DATA_LOADER = threading.Thread(target=fetch_missing_type_data, name="type-data-loader", daemon=True)
+        TYPE_DATA_LOADER.start()
+    else:
+        fetch_missing_type_data()
+
+def fetch_missing_type_data():
+    async def fetch_all_types():
+        async with create_async_session() as session:
+            await get_type_data_many(TYPE_NAMES, session)
+    asyncio.run(fetch_all_types())
+
+def wait_for_type_data(timeout=None):
+    # Block until a background load_all_type_data has finished
+    if TYPE_DATA_LOADER is not None and TYPE_DATA_LOADER is not threading.current_thread():
+        TYPE_DATA_LOADER.join(timeout)
+
+def build_type_chart():
+    # Build the attacking x defending multiplier matrix once from the raw type cache
+    global TYPE_CHART
+    # Start from the snapshot's chart (if any) so fetched types only fill or update columns
+    snapshot_chart = load_snapshot().get('type_chart')
+    chart = np.ones((len(TYPE_NAMES), len(TYPE_NAMES))) if snapshot_chart is None else snapshot_chart.copy()
+    relation_multipliers = [
+        ('double_damage_from', 2),
+        ('half_damage_from', 0.5),
+        ('no_damage_from', 0)
     ]
-    missing_types = [t for t in type_names if t not in POKEMON_TYPES_CACHE]
-    if missing_types:
-        for type_name in missing_types:
+    for defending, type_data in (POKEMON_TYPES_CACHE or {}).items():
+        if defending not in TYPE_INDEX:
+            continue
+        chart[:, TYPE_INDEX[defending]] = 1
+        for relation, multiplier in relation_multipliers:
+            for damage_relation in type_data['damage_relations'][relation]:
+                attacking = damage_relation['name']
+                if attacking in TYPE_INDEX:
+                    chart[TYPE_INDEX[attacking], TYPE_INDEX[defending]] = multiplier
+    chart.flags.writeable = False
+    TYPE_CHART = chart
+    TYPE_PROFILE_CACHE.clear()
+    ANALYSIS_CACHE.clear()
+    if type_chart_complete():
+        build_type_profiles()
+    else:
+        TYPE_PROFILES.clear()
+    return TYPE_CHART
+
+def type_chart_complete():
+    # Whether every chart column comes from fetched type data or the snapshot
+    return all(t in (POKEMON_TYPES_CACHE or {}) or snapshot_covers_type(t) for t in TYPE_NAMES)
+
+def build_type_profiles():
+    # Precompute the profile of every single and dual typing from the complete chart. The
+    # table is persisted next to the type cache and reused while the chart is unchanged
+    global TYPE_PROFILES
+    typings = [(t,) for t in sorted(TYPE_NAMES)] + list(itertools.combinations(sorted(TYPE_NAMES), 2))
+    # All 171 multiplier vectors at once; the extra last column is neutral for mono types
+    neutral = len(TYPE_NAMES)
+    padded = np.hstack([TYPE_CHART, np.ones((len(TYPE_NAMES), 1))])
+    first = [TYPE_INDEX[typing[0]] for typing in typings]
+    second = [TYPE_INDEX[typing[1]] if len(typing) > 1 else neutral for typing in typings]
+    vectors = (padded[:, first] * padded[:, second]).T
+
+    fingerprint = hashlib.sha1(TYPE_CHART.tobytes()).hexdigest()
+    cached = load_cache(TYPE_PROFILES_CACHE_FILE)
+    if isinstance(cached, dict) and cached.get('chart') == fingerprint and cached.get('version') == TYPE_PROFILES_VERSION:
+        table = cached['profiles']
+    else:
+        table = {}
+        for typing, vector in zip(typings, vectors):
+            damage_multipliers = profile_multipliers(vector)
+            groups = group_multipliers(damage_multipliers)
+            table['/'.join(typing)] = [damage_multipliers, [groups[bucket] for bucket in MULTIPLIER_BUCKETS]]
+        save_cache(TYPE_PROFILES_CACHE_FILE, {'chart': fingerprint, 'version': TYPE_PROFILES_VERSION, 'profiles': table})
+
+    profiles = {}
+    for typing, vector in zip(typings, vectors):
+        vector = vector.copy()
+        vector.flags.writeable = False
+        TYPE_PROFILE_CACHE[typing] = vector
+        damage_multipliers, groups = table['/'.join(typing)]
+        profiles[typing] = make_type_profile(damage_multipliers, dict(zip(MULTIPLIER_BUCKETS, groups)))
+    TYPE_PROFILES = profiles
+    return TYPE_PROFILES
+
+def make_type_profile(damage_multipliers, groups):
+    # Read-only (multipliers, groups) pair, shared by every lookup of the typing
+    return (
+        MappingProxyType(damage_multipliers),
+        MappingProxyType({bucket: tuple(type_names) for bucket, type_names in groups.items()})
+    )
+
+def get_defensive_multipliers(types):
+    # Multiplier vector (indexed like TYPE_NAMES) for attacks against a single or dual typing
+    key = tuple(sorted(set(t for t in types if t in TYPE_INDEX)))
+    profile = TYPE_PROFILE_CACHE.get(key)
+    if profile is not None:
+        return profile
+    wait_for_type_data()
+
+    # Fetch any type the chart was built without, then rebuild it
+    missing_types = [
+        t for t in key
+        if (not POKEMON_TYPES_CACHE or t not in POKEMON_TYPES_CACHE) and not snapshot_covers_type(t)
+    ]
+    for type_name in missing_types:
+        get_type_data(api_url(f"type/{type_name}/"))
+    if POKEMON_TYPES_DIRTY:
+        save_type_data()
+    if TYPE_CHART is None or missing_types:
+        build_type_chart()
+
+    profile = np.ones(len(TYPE_NAMES))
+    for type_name in key:
+        profile = profile * TYPE_CHART[:, TYPE_INDEX[type_name]]
+    profile.flags.writeable = False
+    # Only memoize typings the chart fully covers so failed fetches are retried
+    if all(t in POKEMON_TYPES_CACHE or snapshot_covers_type(t) for t in key):
+        TYPE_PROFILE_CACHE[key] = profile
+    return profile
+
+def profile_multipliers(profile):
+    # Non-neutral multipliers by attacking type name from a multiplier vector, in PokeAPI type order
+    multipliers = profile.tolist()
+    return {
+        TYPE_NAMES[i]: int(multipliers[i]) if multipliers[i].is_integer() else float(multipliers[i])
+        for i in POKEAPI_TYPE_INDICES
+        if multipliers[i] != 1
+    }
+
+def get_type_profile(types):
+    # (multipliers, multiplier groups) for a single or dual typing; a dict hit once the chart
+    # is complete, computed on the fly (and not kept) while type data is still missing
+    key = tuple(sorted(set(t for t in types if t in TYPE_INDEX)))
+    profile = TYPE_PROFILES.get(key)
+    if profile is not None:
+        return profile
+    damage_multipliers = profile_multipliers(get_defensive_multipliers(key))
+    # Fetching missing types above may have completed the chart
+    profile = TYPE_PROFILES.get(key)
+    if profile is not None:
+        return profile
+    return make_type_profile(damage_multipliers, group_multipliers(damage_multipliers))
+
+def get_damage_multipliers(types):
+    # Non-neutral multipliers by attacking type name for a single or dual typing
+    return dict(get_type_profile(types)[0])
+
+def build_matchup_matrix(pokemon_data=None):
+    # Multiplier matrix of every cached pokemon (rows) against every attacking type (columns)
+    # (defaults to the snapshot and the whole on-disk store plus unsaved in-memory entries)
+    global MATCHUP_MATRIX_CACHE
+    wait_for_type_data()
+    if TYPE_CHART is None:
+        build_type_chart()
+    memory_data = (POKEMON_DATA_CACHE or {}) if pokemon_data is None else pokemon_data
+    # Keyed on the in-memory typings themselves: entries can be replaced in place, and an LRU
+    # at capacity swaps entries without changing its length
+    memory_typings = frozenset((data.name, data.types) for data in memory_data.values() if data)
+    if pokemon_data is None:
+        cache_key = ('store', open_pokemon_store().total_changes, memory_typings, id(TYPE_CHART))
+    else:
+        cache_key = ('explicit', memory_typings, id(TYPE_CHART))
+    if MATCHUP_MATRIX_CACHE and MATCHUP_MATRIX_CACHE[0] == cache_key:
+        return MATCHUP_MATRIX_CACHE[1], MATCHUP_MATRIX_CACHE[2]
+
+    # Collect each pokemon once (entries may be cached under both name and ID)
+    typings = {}
+    if pokemon_data is None:
+        for name, record in load_snapshot().get('records', {}).items():
+            typings[name] = record['types']
+        typings.update(store_typings())
+    for data in memory_data.values():
+        if data and data.name not in typings:
+            typings[data.name] = list(data.types)
+    names = sorted(typings)
+
+    # Index of each pokemon's first/second type; the extra last row is neutral for mono types
+    neutral = len(TYPE_NAMES)
+    first = np.full(len(names), neutral, dtype=np.intp)
+    second = np.full(len(names), neutral, dtype=np.intp)
+    for row, name in enumerate(names):
+        type_indices = [TYPE_INDEX[t] for t in typings[name] if t in TYPE_INDEX]
+        if type_indices:
+            first[row] = type_indices[0]
+        if len(type_indices) > 1:
+            second[row] = type_indices[1]
+
+    defending = np.vstack([TYPE_CHART.T, np.ones(len(TYPE_NAMES))])
+    matrix = defending[first] * defending[second]
+    matrix.flags.writeable = False
+    MATCHUP_MATRIX_CACHE = (cache_key, names, matrix)
+    return names, matrix
+
+def rank_pokemon_by_matchup(attacking_type, top_n=10, most_weak=True, pokemon_data=None):
+    # Top N pokemon most weak (or most resistant) to an attacking type, as (name, multiplier)
+    attacking_type = attacking_type.lower()
+    if attacking_type not in TYPE_INDEX:
+        return []
+    names, matrix = build_matchup_matrix(pokemon_data)
+    column = matrix[:, TYPE_INDEX[attacking_type]]
+    # Stable sort keeps alphabetical order among equal multipliers
+    order = np.argsort(-column if most_weak else column, kind='stable')[:top_n]
+    return [(names[i], float(column[i])) for i in order]
+
+def open_pokemon_store():
+    # Open the on-disk pokemon store, creating it and migrating the legacy JSON cache if needed
+    global POKEMON_DATA_DB
+    with POKEMON_DATA_DB_LOCK:
+        if POKEMON_DATA_DB is not None:
+            return POKEMON_DATA_DB
+        ensure_cache_dir()
+        # WAL plus a busy timeout lets several worker processes share one store
+        db = sqlite3.connect(POKEMON_DATA_DB_FILE, timeout=30, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS pokemon ("
+            "key TEXT PRIMARY KEY, name TEXT, id INTEGER, types TEXT, data TEXT NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS pokemon_name ON pokemon (name)")
+        db.execute("CREATE INDEX IF NOT EXISTS pokemon_id ON pokemon (id)")
+        db.execute("CREATE TABLE IF NOT EXISTS pokemon_raw (key TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS fetch_meta ("
+            "path TEXT PRIMARY KEY, fetched_at REAL NOT NULL, etag TEXT, last_modified TEXT)"
+        )
+        db.commit()
+        POKEMON_DATA_DB = db
+
+    # Import the old monolithic pokemon_data.json once, then drop it
+    if os.path.exists(POKEMON_DATA_CACHE_FILE):
+        with cache_lock(POKEMON_DATA_CACHE_FILE):
+            legacy_data = load_cache(POKEMON_DATA_CACHE_FILE)
+            if legacy_data is not None:
+                store_put_pokemon((key, PokemonRecord.from_dict(data)) for key, data in legacy_data.items())
+                if STORE_RAW_PAYLOADS:
+                    store_put_raw_pokemon(legacy_data.items())
+                os.remove(POKEMON_DATA_CACHE_FILE)
+    return POKEMON_DATA_DB
+
+def store_get_pokemon(key):
+    # Load a single pokemon from the store by cache key, name or ID
+    db = open_pokemon_store()
+    key = str(key).lower()
+    if key.isdigit():
+        query = "SELECT data FROM pokemon WHERE key = ? OR id = ? LIMIT 1"
+        params = (key, int(key))
+    else:
+        query = "SELECT data FROM pokemon WHERE key = ? OR name = ? LIMIT 1"
+        params = (key, key)
+    with POKEMON_DATA_DB_LOCK:
+        row = db.execute(query, params).fetchone()
+    return PokemonRecord.from_dict(json.loads(row[0])) if row else None
+
+def store_get_raw_pokemon(key):
+    # Full PokeAPI payload for a cache key, if raw payloads were stored
+    db = open_pokemon_store()
+    with POKEMON_DATA_DB_LOCK:
+        row = db.execute("SELECT data FROM pokemon_raw WHERE key = ?", (str(key).lower(),)).fetchone()
+    return decode_cache_data(row[0]) if row else None
+
+def store_put_pokemon(items):
+    # Insert or replace (key, record) pairs in the store in a single transaction
+    db = open_pokemon_store()
+    rows = [
+        (str(key).lower(), record.name, record.id, ','.join(record.types), json.dumps(record.to_dict()))
+        for key, record in items
+        if record
+    ]
+    with POKEMON_DATA_DB_LOCK:
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO pokemon (key, name, id, types, data) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+    return len(rows)
+
+def store_put_raw_pokemon(items):
+    # Insert or replace (key, raw payload) pairs in the raw payload table
+    db = open_pokemon_store()
+    rows = [(str(key).lower(), encode_cache_data(data, RAW_PAYLOAD_FORMAT)) for key, data in items if data]
+    with POKEMON_DATA_DB_LOCK:
+        with db:
+            db.executemany("INSERT OR REPLACE INTO pokemon_raw (key, data) VALUES (?, ?)", rows)
+    return len(rows)
+
+def store_keys():
+    # All cache keys currently in the store
+    db = open_pokemon_store()
+    with POKEMON_DATA_DB_LOCK:
+        return {row[0] for row in db.execute("SELECT key FROM pokemon")}
+
+def store_typings():
+    # Type names of every stored pokemon, keyed by pokemon name, without loading payloads
+    db = open_pokemon_store()
+    with POKEMON_DATA_DB_LOCK:
+        rows = db.execute("SELECT name, types FROM pokemon").fetchall()
+    return {name: types.split(',') for name, types in rows if name and types}
+
+def flush_fetch_metadata():
+    # Write pending fetch metadata; validators missing from a revalidation keep their old value
+    with FETCH_META_LOCK:
+        pending = list(FETCH_META_PENDING.items())
+        FETCH_META_PENDING.clear()
+    if not pending:
+        return
+    db = open_pokemon_store()
+    with POKEMON_DATA_DB_LOCK:
+        with db:
+            db.executemany(
+                "INSERT INTO fetch_meta (path, fetched_at, etag, last_modified) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET fetched_at = excluded.fetched_at, "
+                "etag = COALESCE(excluded.etag, etag), "
+                "last_modified = COALESCE(excluded.last_modified, last_modified)",
+                [(path, fetched_at, etag, last_modified) for path, (fetched_at, etag, last_modified) in pending]
+            )
+
+def load_fetch_metadata():
+    # {api path: (fetched_at, etag, last_modified)} for every recorded fetch
+    flush_fetch_metadata()
+    db = open_pokemon_store()
+    with POKEMON_DATA_DB_LOCK:
+        rows = db.execute("SELECT path, fetched_at, etag, last_modified FROM fetch_meta").fetchall()
+    return {path: (fetched_at, etag, last_modified) for path, fetched_at, etag, last_modified in rows}
+
+def create_pokemon_cache():
+    # Bounded in-memory pokemon cache; unsaved entries are never evicted
+    return LRUCache(
+        POKEMON_CACHE_MAX_ENTRIES,
+        POKEMON_CACHE_MAX_BYTES,
+        sizeof=PokemonRecord.approximate_size,
+        pinned=POKEMON_DATA_DIRTY.__contains__
+    )
+
+def cache_pokemon(key, record, raw_data=None):
+    # Keep a pokemon in memory and mark it for the next save_all_pokemon_data
+    global POKEMON_DATA_CACHE
+    if POKEMON_DATA_CACHE is None:
+        POKEMON_DATA_CACHE = create_pokemon_cache()
+    key = str(key).lower()
+    with POKEMON_DATA_DIRTY_LOCK:
+        POKEMON_DATA_DIRTY.add(key)
+        POKEMON_DATA_CACHE[key] = record
+        if raw_data is not None and STORE_RAW_PAYLOADS:
+            POKEMON_RAW_PENDING[key] = raw_data
+    schedule_write_behind(key)
+
+def schedule_write_behind(key):
+    # Queue a key for the write-behind thread, starting the thread on first use
+    global WRITE_BEHIND_THREAD
+    if WRITE_BEHIND_THREAD is None or not WRITE_BEHIND_THREAD.is_alive():
+        WRITE_BEHIND_THREAD = threading.Thread(target=write_behind_worker, name="pokemon-write-behind", daemon=True)
+        WRITE_BEHIND_THREAD.start()
+    WRITE_BEHIND_QUEUE.put(key)
+
+def write_behind_worker():
+    # Save queued pokemon in batches; anything left at exit is saved by flush_caches
+    while True:
+        WRITE_BEHIND_QUEUE.get()
+        batched = 1
+        deadline = time.monotonic() + WRITE_BEHIND_DELAY
+        while batched < WRITE_BEHIND_BATCH_SIZE:
             try:
-                response = requests.get(f"https://pokeapi.co/api/v2/type/{type_name}")
-                if response.status_code == 200:
-                    POKEMON_TYPES_CACHE[type_name] = response.json()
-            except:
-                pass
-        save_cache(POKEMON_TYPES_CACHE_FILE, POKEMON_TYPES_CACHE)
+                WRITE_BEHIND_QUEUE.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            batched += 1
+        try:
+            save_all_pokemon_data()
+        except Exception as e:
+            # Entries stay dirty, so the next batch or exit flush retries them
+            print(f"Could not save cached Pokémon: {e}", file=sys.stderr)
 
 def load_all_pokemon_data():
+    # Open the store; entries are loaded on demand instead of all at startup
     global POKEMON_DATA_CACHE
-    POKEMON_DATA_CACHE = load_cache(POKEMON_DATA_CACHE_FILE) or {}
+    open_pokemon_store()
+    POKEMON_DATA_CACHE = create_pokemon_cache()
 
 def save_all_pokemon_data():
+    # Write only entries added since the last save; safe to call from any thread
+    with POKEMON_DATA_SAVE_LOCK:
+        flush_fetch_metadata()
+        cache = POKEMON_DATA_CACHE or {}
+        with POKEMON_DATA_DIRTY_LOCK:
+            items = [(key, cache[key]) for key in POKEMON_DATA_DIRTY if key in cache]
+            raw_items = list(POKEMON_RAW_PENDING.items())
+        store_put_pokemon(items)
+        if raw_items:
+            store_put_raw_pokemon(raw_items)
+
+        # Entries cached again while saving stay dirty for the next save
+        with POKEMON_DATA_DIRTY_LOCK:
+            for key, record in items:
+                if key not in cache or cache[key] is record:
+                    POKEMON_DATA_DIRTY.discard(key)
+            for key, data in raw_items:
+                if POKEMON_RAW_PENDING.get(key) is data:
+                    del POKEMON_RAW_PENDING[key]
+        # Saved entries can be evicted again
+        if POKEMON_DATA_CACHE:
+            POKEMON_DATA_CACHE.trim()
+
+def resolve_pokemon_key(pokemon_name_or_id):
+    # Convert input to the pokemon ID / name used as cache key and API path
+    pokemon_name_or_id = str(pokemon_name_or_id).strip()
+    query = pokemon_name_or_id.lower()
+    if query.isdigit():
+        return query
+
+    # Handle special forms
+    if query.startswith('mega '):
+        base_name = query[5:]
+        form_key = "mega-{}"
+    elif query.startswith('gigantamax ') or query.startswith('gmax '):
+        base_name = query.replace('gigantamax ', '').replace('gmax ', '')
+        form_key = "gigantamax-{}"
+    else:
+        base_name = query
+        form_key = "{}"
+        for prefix, variant in REGIONAL_PREFIXES.items():
+            if query.startswith(prefix):
+                base_name = query[len(prefix):]
+                form_key = "{}-" + variant
+                break
+
+    closest_name = find_closest_pokemon_name(base_name)
+    if closest_name:
+        return form_key.format(closest_name)
+    return query
+
+def get_cached_pokemon(pokemon_key):
+    # Look up a resolved key in memory, then in the on-disk store, then in the bundled snapshot
     global POKEMON_DATA_CACHE
-    save_cache(POKEMON_DATA_CACHE_FILE, POKEMON_DATA_CACHE)
+    if POKEMON_DATA_CACHE is None:
+        POKEMON_DATA_CACHE = create_pokemon_cache()
+    record = POKEMON_DATA_CACHE.get(pokemon_key)
+    if record:
+        return record
+    record = store_get_pokemon(pokemon_key) or get_snapshot_pokemon(pokemon_key)
+    if record:
+        POKEMON_DATA_CACHE[pokemon_key] = record
+    return record
 
 def get_pokemon_data(pokemon_name_or_id):
-    global POKEMON_DATA_CACHE
-    # Convert input to pokemon ID
-    if str(pokemon_name_or_id).isdigit():
-        pokemon_id = pokemon_name_or_id
-    else:
-        # Handle special forms
-        if pokemon_name_or_id.lower().startswith('mega '):
-            base_name = pokemon_name_or_id[5:].lower()
-            closest_name = find_closest_pokemon_name(base_name)
-            if closest_name:
-                pokemon_id = f"mega-{closest_name}"
-            else:
-                pokemon_id = pokemon_name_or_id
-        elif pokemon_name_or_id.lower().startswith('gigantamax ') or pokemon_name_or_id.lower().startswith('gmax '):
-            base_name = pokemon_name_or_id.lower().replace('gigantamax ', '').replace('gmax ', '')
-            closest_name = find_closest_pokemon_name(base_name)
-            if closest_name:
-                pokemon_id = f"gigantamax-{closest_name}"
-            else:
-                pokemon_id = pokemon_name_or_id
-        elif any(pokemon_name_or_id.lower().startswith(prefix) for prefix in ['alolan ', 'galarian ', 'hisuian ', 'paldean ']):
-            if pokemon_name_or_id.lower().startswith('alolan '):
-                base_name = pokemon_name_or_id[7:].lower()
-                variant = 'alola'
-            elif pokemon_name_or_id.lower().startswith('galarian '):
-                base_name = pokemon_name_or_id[9:].lower()
-                variant = 'galar'
-            elif pokemon_name_or_id.lower().startswith('hisuian '):
-                base_name = pokemon_name_or_id[8:].lower()
-                variant = 'hisui'
-            elif pokemon_name_or_id.lower().startswith('paldean '):
-                base_name = pokemon_name_or_id[8:].lower()
-                variant = 'paldea'
-            
-            closest_name = find_closest_pokemon_name(base_name)
-            if closest_name:
-                pokemon_id = f"{closest_name}-{variant}"
-            else:
-                pokemon_id = pokemon_name_or_id
-        else:
-            closest_name = find_closest_pokemon_name(pokemon_name_or_id)
-            if closest_name:
-                pokemon_id = closest_name
-            else:
-                pokemon_id = pokemon_name_or_id
+    pokemon_id = resolve_pokemon_key(pokemon_name_or_id)
 
-    # Check cache first (in-memory)
-    if POKEMON_DATA_CACHE and str(pokemon_id).lower() in POKEMON_DATA_CACHE:
-        return POKEMON_DATA_CACHE[str(pokemon_id).lower()], "cache"
+    # Reject keys PokeAPI recently answered 404 for without asking again
+    if is_known_missing(pokemon_id):
+        return None, "error"
+
+    # Check cache first (in-memory, then the on-disk store)
+    record = get_cached_pokemon(pokemon_id)
+    if record:
+        return record, "cache"
 
     # Fetch from API if not in cache
     try:
-        response = requests.get(f"https://pokeapi.co/api/v2/pokemon/{pokemon_id.lower()}")
-        data = response.json()
+        data = api_get_json(f"pokemon/{pokemon_id}")
+        record = PokemonRecord.from_api(data)
         # Save to in-memory cache
-        if POKEMON_DATA_CACHE is None:
-            POKEMON_DATA_CACHE = {}
-        POKEMON_DATA_CACHE[str(pokemon_id).lower()] = data
-        return data, "api"
+        cache_pokemon(pokemon_id, record, data)
+        return record, "api"
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            remember_missing(pokemon_id)
+        return None, "error"
     except:
         return None, "error"
 
-def get_type_data(type_url):
+async def fetch_pokemon_record(session, pokemon_key):
+    # Fetch and cache one pokemon, sharing the request with any concurrent lookup of the same key
+    if is_known_missing(pokemon_key):
+        return None, "error"
+    loop = asyncio.get_running_loop()
+    task = POKEMON_IN_FLIGHT.get(pokemon_key)
+    if task is None or task.get_loop() is not loop:
+        task = loop.create_task(fetch_json_status(session, f"pokemon/{pokemon_key}"))
+        POKEMON_IN_FLIGHT[pokemon_key] = task
+        task.add_done_callback(lambda _: POKEMON_IN_FLIGHT.pop(pokemon_key, None))
+    status, data = await asyncio.shield(task)
+    if status == 404:
+        remember_missing(pokemon_key)
+    if not data:
+        return None, "error"
+    record = get_cached_pokemon(pokemon_key)
+    if record is None:
+        record = PokemonRecord.from_api(data)
+        cache_pokemon(pokemon_key, record, data)
+    return record, "api"
+
+async def get_type_data_many(type_names, session):
+    # Fetch every type missing from POKEMON_TYPES_CACHE concurrently and rebuild the chart
     global POKEMON_TYPES_CACHE
+    if POKEMON_TYPES_CACHE is None:
+        POKEMON_TYPES_CACHE = {}
+    missing_types = sorted({
+        t for t in type_names
+        if t in TYPE_INDEX and t not in POKEMON_TYPES_CACHE and not snapshot_covers_type(t)
+    })
+    if not missing_types:
+        return
+    results = await asyncio.gather(*(
+        fetch_json(session, f"type/{type_name}") for type_name in missing_types
+    ))
+    for type_name, data in zip(missing_types, results):
+        if data:
+            POKEMON_TYPES_CACHE[type_name] = data
+    save_type_data()
+    build_type_chart()
+
+async def get_pokemon_data_many(pokemon_names_or_ids, session=None):
+    # Resolve many pokemon (and any type data they need) concurrently;
+    # returns (record, source) pairs in input order
+    keys = [resolve_pokemon_key(name_or_id) for name_or_id in pokemon_names_or_ids]
+    own_session = session is None
+    if own_session:
+        session = create_async_session()
+    try:
+        lookups = {}
+        for key in keys:
+            if key in lookups:
+                continue
+            record = get_cached_pokemon(key)
+            if record:
+                lookups[key] = asyncio.sleep(0, result=(record, "cache"))
+            else:
+                lookups[key] = fetch_pokemon_record(session, key)
+        results = dict(zip(lookups, await asyncio.gather(*lookups.values())))
+        await get_type_data_many(
+            {t for record, _ in results.values() if record for t in record.types}, session
+        )
+    finally:
+        if own_session:
+            await session.close()
+    return [results[key] for key in keys]
+
+async def stream_pokemon_data(pokemon_names_or_ids, session=None, concurrency=HTTP_POOL_SIZE):
+    # Resolve many pokemon concurrently, yielding (query, record, source) as each one
+    # completes rather than in input order; at most `concurrency` API requests run at once
+    own_session = session is None
+    if own_session:
+        session = create_async_session(limit=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def lookup(query):
+        key = resolve_pokemon_key(query)
+        record = get_cached_pokemon(key)
+        if record:
+            return query, record, "cache"
+        async with semaphore:
+            record, source = await fetch_pokemon_record(session, key)
+        return query, record, source
+
+    tasks = []
+    try:
+        # Every result needs the type chart, so fill any gaps in it once up front
+        await get_type_data_many(TYPE_NAMES, session)
+        tasks = [asyncio.ensure_future(lookup(query)) for query in pokemon_names_or_ids]
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        for task in tasks:
+            task.cancel()
+        if own_session:
+            await session.close()
+
+def get_type_data(type_url):
+    # Fetched types are saved in batches (save_type_data / flush_caches), not on every miss
+    global POKEMON_TYPES_CACHE, POKEMON_TYPES_DIRTY
     type_name = type_url.split('/')[-2]
     if POKEMON_TYPES_CACHE and type_name in POKEMON_TYPES_CACHE:
         return POKEMON_TYPES_CACHE[type_name], "cache"
     # Fetch from API if not in cache
     try:
-        response = requests.get(type_url)
-        data = response.json()
+        data = api_get_json(type_url)
         # Save to in-memory cache
         if POKEMON_TYPES_CACHE is None:
             POKEMON_TYPES_CACHE = {}
         POKEMON_TYPES_CACHE[type_name] = data
-        save_cache(POKEMON_TYPES_CACHE_FILE, POKEMON_TYPES_CACHE)
+        POKEMON_TYPES_DIRTY = True
         return data, "api"
     except:
         return None, "error"
 
 def analyze_best_attack_strategy(data, damage_multipliers):
     # Get defense stats
-    defense = 0
-    sp_defense = 0
-    for stat in data['stats']:
-        if stat['stat']['name'] == 'defense':
-            defense = stat['base_stat']
-        if stat['stat']['name'] == 'special-defense':
-            sp_defense = stat['base_stat']
+    defense = data.get_stat('defense')
+    sp_defense = data.get_stat('special-defense')
     
     # Choose physical or special based on lower defense
     attack_type = "Either" if defense == sp_defense else "Physical" if defense < sp_defense else "Special"
     
-    # Find type with highest damage multiplier
+    # Find type with highest damage multiplier; ties go to the first type in PokeAPI type id
+    # order, the order the API lists damage relations in
     best_type = None
     best_multiplier = 0
     
@@ -222,7 +1645,10 @@ def analyze_best_attack_strategy(data, damage_multipliers):
     worst_multiplier = 1
     
     for type_name, multiplier in damage_multipliers.items():
-        if multiplier > best_multiplier:
+        if multiplier > best_multiplier or (
+            multiplier == best_multiplier and best_type
+            and POKEAPI_TYPE_RANK.get(type_name, 0) < POKEAPI_TYPE_RANK.get(best_type, 0)
+        ):
             best_multiplier = multiplier
             best_type = type_name
         
@@ -248,98 +1674,114 @@ def analyze_best_attack_strategy(data, damage_multipliers):
         'sp_defense': sp_defense
     }
 
-def search_pokemon(query):
+def group_multipliers(damage_multipliers):
+    # Attacking types bucketed by multiplier (see MULTIPLIER_BUCKETS), sorted by name
+    multiplier_groups = {bucket: [] for bucket in MULTIPLIER_BUCKETS}
+    for type_name, multiplier in damage_multipliers.items():
+        if multiplier >= 4:
+            multiplier_groups[4].append(type_name)
+        elif multiplier >= 2:
+            multiplier_groups[2].append(type_name)
+        elif multiplier <= 0:
+            multiplier_groups[0].append(type_name)
+        elif multiplier <= 0.25:
+            multiplier_groups[0.25].append(type_name)
+        elif multiplier <= 0.5:
+            multiplier_groups[0.5].append(type_name)
+        else:
+            multiplier_groups[1].append(type_name)
+    return {bucket: sorted(type_names) for bucket, type_names in multiplier_groups.items()}
+
+def analyze_pokemon(data):
+    # Type matchup analysis of a pokemon, without any output. Results are memoized by typing
+    # and defense stats, so repeated species and species sharing both reuse one result
+    types = tuple(sorted(t for t in data.types if t in TYPE_INDEX))
+    key = (types, data.get_stat('defense'), data.get_stat('special-defense'))
+    analysis = ANALYSIS_CACHE.get(key)
+    if analysis is not None:
+        return analysis
+
+    damage_multipliers, groups = get_type_profile(types)
+    analysis = PokemonAnalysis(
+        types, key[1], key[2],
+        damage_multipliers,
+        groups,
+        analyze_best_attack_strategy(data, damage_multipliers)
+    )
+    # Only memoize typings from the precomputed table, so missing type data is retried
+    if types in TYPE_PROFILES:
+        ANALYSIS_CACHE[key] = analysis
+    return analysis
+
+def build_search_index(base_names, label_format="{}"):
+    # Suffix array over base names; matches are returned as formatted labels in name order
+    base_names = sorted(set(base_names))
+    suffixes = sorted(
+        (name[offset:], i)
+        for i, name in enumerate(base_names)
+        for offset in range(len(name))
+    )
+    return {
+        'names': base_names,
+        'labels': [label_format.format(name) for name in base_names],
+        'suffixes': [suffix for suffix, _ in suffixes],
+        'owners': [i for _, i in suffixes]
+    }
+
+def build_search_indexes(pokemon_names):
+    # Search indexes for regular names and every form group, built once per name list
+    global SEARCH_INDEXES
+    indexes = {
+        '': build_search_index(pokemon_names),
+        'mega': build_search_index(MEGA_CAPABLE, "mega-{}"),
+        'gigantamax': build_search_index(GMAX_CAPABLE, "gigantamax-{}")
+    }
+    for variant, base_names in REGIONAL_VARIANTS.items():
+        indexes[variant] = build_search_index(base_names, "{}-" + variant)
+    SEARCH_INDEXES = (pokemon_names, indexes)
+    return indexes
+
+def query_search_index(index, query, prefix_only=False):
+    # Labels of names containing (or starting with) query, in name order
+    if prefix_only:
+        names = index['names']
+        start = bisect.bisect_left(names, query)
+        end = start
+        while end < len(names) and names[end].startswith(query):
+            end += 1
+        return index['labels'][start:end]
+
+    suffixes = index['suffixes']
+    start = bisect.bisect_left(suffixes, query)
+    end = bisect.bisect_left(suffixes, query + '\uffff', start)
+    matches = set(index['owners'][start:end])
+    return [index['labels'][i] for i in sorted(matches)]
+
+def search_pokemon(query, prefix_only=False):
     # Search for pokemon by name only (no type search)
     pokemon_names, source = get_all_pokemon_names()
     if not pokemon_names:
         return [], source
 
-    results = []
+    if SEARCH_INDEXES is None or SEARCH_INDEXES[0] is not pokemon_names:
+        indexes = build_search_indexes(pokemon_names)
+    else:
+        indexes = SEARCH_INDEXES[1]
+
     query = query.lower()
-    
-    # Handle mega searches
+
+    # Handle mega, Gigantamax and regional variant searches against their form lists
     if query.startswith('mega '):
-        base_name = query[5:]  # Remove 'mega ' prefix
-        # Search for base Pokémon that can mega evolve
-        mega_capable = [
-            'venusaur', 'charizard', 'blastoise', 'alakazam', 'gengar', 
-            'kangaskhan', 'pinsir', 'gyarados', 'aerodactyl', 'mewtwo',
-            'ampharos', 'scizor', 'heracross', 'houndoom', 'tyranitar',
-            'blaziken', 'gardevoir', 'mawile', 'aggron', 'medicham',
-            'manectric', 'banette', 'absol', 'garchomp', 'lucario',
-            'abomasnow', 'beedrill', 'pidgeot', 'slowbro', 'steelix',
-            'sceptile', 'swampert', 'sableye', 'sharpedo', 'camerupt',
-            'altaria', 'glalie', 'salamence', 'metagross', 'latias',
-            'latios', 'rayquaza', 'lopunny', 'gallade', 'audino',
-            'diancie'
-        ]
-        
-        for name in mega_capable:
-            if base_name in name:
-                results.append(f"mega-{name}")
-    
-    # Handle Gigantamax searches
-    elif query.startswith('gigantamax ') or query.startswith('gmax '):
+        return query_search_index(indexes['mega'], query[5:], prefix_only), source
+    if query.startswith('gigantamax ') or query.startswith('gmax '):
         base_name = query.replace('gigantamax ', '').replace('gmax ', '')
-        # Search for base Pokémon that can Gigantamax
-        gmax_capable = [
-            'venusaur', 'charizard', 'blastoise', 'butterfree', 'pikachu',
-            'meowth', 'machamp', 'gengar', 'kingler', 'lapras',
-            'eevee', 'snorlax', 'garbodor', 'corviknight', 'orbeetle',
-            'drednaw', 'coalossal', 'flapple', 'appletun', 'sandaconda',
-            'toxtricity', 'centiskorch', 'hatterene', 'grimmsnarl',
-            'alcremie', 'copperajah', 'duraludon', 'urshifu', 'calyrex'
-        ]
-        
-        for name in gmax_capable:
-            if base_name in name:
-                results.append(f"gigantamax-{name}")
-    
-    # Handle regional variant searches
-    elif any(query.startswith(prefix) for prefix in ['alolan ', 'galarian ', 'hisuian ', 'paldean ']):
-        if query.startswith('alolan '):
-            base_name = query[7:]
-            variant = 'alola'
-        elif query.startswith('galarian '):
-            base_name = query[9:]
-            variant = 'galar'
-        elif query.startswith('hisuian '):
-            base_name = query[8:]
-            variant = 'hisui'
-        elif query.startswith('paldean '):
-            base_name = query[8:]
-            variant = 'paldea'
-        
-        # Search for base Pokémon that have regional variants
-        regional_variants = {
-            'alola': ['rattata', 'raticate', 'raichu', 'sandshrew', 'sandslash', 
-                     'vulpix', 'ninetales', 'diglett', 'dugtrio', 'meowth', 
-                     'persian', 'geodude', 'graveler', 'golem', 'grimer', 
-                     'muk', 'exeggutor', 'marowak', 'cubone', 'kangaskhan'],
-            'galar': ['meowth', 'persian', 'ponyta', 'rapidash', 'farfetchd', 
-                     'weezing', 'mr-mime', 'articuno', 'zapdos', 'moltres',
-                     'slowpoke', 'slowbro', 'slowking', 'corsola', 'zigzagoon',
-                     'linoone', 'darumaka', 'darmanitan', 'yamask', 'stunfisk',
-                     'basculin', 'zorua', 'zoroark', 'tornadus', 'thundurus',
-                     'landorus', 'enamorus'],
-            'hisui': ['growlithe', 'arcanine', 'voltorb', 'electrode', 'typhlosion',
-                     'qwilfish', 'sneasel', 'samurott', 'lilligant', 'basculin',
-                     'zorua', 'zoroark', 'braviary', 'sliggoo', 'goodra',
-                     'avalugg', 'decidueye'],
-            'paldea': ['tauros', 'wooper', 'mimikyu']
-        }
-        
-        if variant in regional_variants:
-            for name in regional_variants[variant]:
-                if base_name in name:
-                    results.append(f"{name}-{variant}")
-    else:
-        # Regular search
-        for name in pokemon_names:
-            if query in name:
-                results.append(name)
-    
-    return results, source
+        return query_search_index(indexes['gigantamax'], base_name, prefix_only), source
+    for prefix, variant in REGIONAL_PREFIXES.items():
+        if query.startswith(prefix):
+            return query_search_index(indexes[variant], query[len(prefix):], prefix_only), source
+
+    # Regular search
+    return query_search_index(indexes[''], query, prefix_only), source
 
 def display_pokemon_info(data, source):
     if not data:
@@ -347,87 +1789,44 @@ def display_pokemon_info(data, source):
         return
 
     # Display basic info with source
-    print(f"\n--- {data['name'].upper()} ---")
+    print(f"\n--- {data.name.upper()} ---")
     print(f"Data Source: {source.upper()}")
-    print(f"ID: {data['id']}")
+    print(f"ID: {data.id}")
 
-    types = [t['type']['name'] for t in data['types']]
+    types = list(data.types)
     print(f"Types: {', '.join(types).title()}")
 
     # Display stats
     print("\nStats:")
-    for stat in data['stats']:
-        stat_name = stat['stat']['name'].replace('-', ' ').title()
-        base_stat = stat['base_stat']
+    for stat_name, base_stat in data.stats:
+        stat_name = stat_name.replace('-', ' ').title()
         print(f"  {stat_name}: {base_stat}")
 
     # Group type effectiveness
     print("\n--Damage Relationships--")
-
-    # Calculate type effectiveness
-    damage_multipliers = {}
-    for pokemon_type in data['types']:
-        type_url = pokemon_type['type']['url']
-        type_data, type_source = get_type_data(type_url)
-        if type_data:
-            # Calculate damage multipliers
-            for damage_relation in type_data['damage_relations']['double_damage_from']:
-                type_name = damage_relation['name']
-                damage_multipliers[type_name] = damage_multipliers.get(type_name, 1) * 2
-            
-            for damage_relation in type_data['damage_relations']['half_damage_from']:
-                type_name = damage_relation['name']
-                damage_multipliers[type_name] = damage_multipliers.get(type_name, 1) * 0.5
-            
-            for damage_relation in type_data['damage_relations']['no_damage_from']:
-                type_name = damage_relation['name']
-                damage_multipliers[type_name] = 0
-
-        
-    multiplier_groups = {
-        4: [],
-        2: [],
-        1: [],
-        0.5: [],
-        0.25: [],
-        0: []
-    }
-    
-    # Sort types by effectiveness
-    for type_name, multiplier in damage_multipliers.items():
-        if multiplier >= 4:
-            multiplier_groups[4].append(type_name)
-        elif multiplier >= 2:
-            multiplier_groups[2].append(type_name)
-        elif multiplier <= 0:
-            multiplier_groups[0].append(type_name)
-        elif multiplier <= 0.25:
-            multiplier_groups[0.25].append(type_name)
-        elif multiplier <= 0.5:
-            multiplier_groups[0.5].append(type_name)
-        else:
-            multiplier_groups[1].append(type_name)
+    analysis = analyze_pokemon(data)
+    multiplier_groups = analysis.groups
 
     # Show weaknesses
     if multiplier_groups[4] or multiplier_groups[2]:
         print("\nWeaknesses:")
         if multiplier_groups[4]:
-            print(f"  4x: {', '.join(sorted(multiplier_groups[4])).title()}")
+            print(f"  4x: {', '.join(multiplier_groups[4]).title()}")
         if multiplier_groups[2]:
-            print(f"  2x: {', '.join(sorted(multiplier_groups[2])).title()}")
+            print(f"  2x: {', '.join(multiplier_groups[2]).title()}")
     
     # Show resistances
     if multiplier_groups[0] or multiplier_groups[0.25] or multiplier_groups[0.5]:
         print("\nResistances:")
         if multiplier_groups[0]:
-            print(f"  Immune: {', '.join(sorted(multiplier_groups[0])).title()}")
+            print(f"  Immune: {', '.join(multiplier_groups[0]).title()}")
         if multiplier_groups[0.25]:
-            print(f"  1/4x: {', '.join(sorted(multiplier_groups[0.25])).title()}")
+            print(f"  1/4x: {', '.join(multiplier_groups[0.25]).title()}")
         if multiplier_groups[0.5]:
-            print(f"  1/2x: {', '.join(sorted(multiplier_groups[0.5])).title()}")
+            print(f"  1/2x: {', '.join(multiplier_groups[0.5]).title()}")
 
-# Show attack recommendations
-    attack_strategy = analyze_best_attack_strategy(data, damage_multipliers)
+    # Show attack recommendations
+    attack_strategy = analysis.strategy
     
     print("\nRecommended Attack Strategy:")
     print(f"  Attack Category: {attack_strategy['attack_category']} (Defense: {attack_strategy['defense']}, Sp. Defense: {attack_strategy['sp_defense']})")
@@ -445,6 +1844,195 @@ def display_pokemon_info(data, source):
         worst_types_str = ', '.join(t.title() for t in sorted(attack_strategy['worst_types']))
         print(f"  Worst Types: {worst_types_str} (Multiplier: {attack_strategy['worst_multiplier']}x)")
 
+def lookup_result(query, record, source):
+    # JSON-ready summary of one lookup, as printed by batch mode and served by server mode
+    if not record:
+        return {'query': query, 'source': source, 'error': "Pokémon not found"}
+    analysis = analyze_pokemon(record).to_dict()
+    return {
+        'query': query,
+        'source': source,
+        'name': record.name,
+        'id': record.id,
+        'types': list(record.types),
+        'stats': dict(record.stats),
+        'multipliers': analysis['multipliers'],
+        'strategy': analysis['strategy']
+    }
+
+def run_batch(input_path="-"):
+    # Non-interactive mode: one name or ID per line from a file or stdin ("-"), one JSON
+    # object per line on stdout in completion order; returns False if any lookup failed
+    if input_path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(input_path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    queries = [line.strip() for line in lines if line.strip()]
+
+    # stream_pokemon_data fetches any missing types itself, in one wave
+    load_all_type_data(fetch_missing=False)
+    load_all_pokemon_data()
+    failed = 0
+
+    async def process_all():
+        nonlocal failed
+        async for query, record, source in stream_pokemon_data(queries):
+            if not record:
+                failed += 1
+            sys.stdout.write(json.dumps(lookup_result(query, record, source), ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+
+    try:
+        asyncio.run(process_all())
+    finally:
+        # Keep whatever was fetched, even if the output pipe was closed early
+        save_all_pokemon_data()
+    return failed == 0
+
+def create_server_app(cache_ttl=SERVER_CACHE_TTL, cache_size=SERVER_CACHE_SIZE):
+    # aiohttp application serving lookups, search and matchup analysis from the shared caches.
+    # Identical concurrent requests share one computation and successful responses are cached
+    from aiohttp import web
+
+    # Request path and query -> (expires at, JSON body)
+    responses = OrderedDict()
+    in_flight = {}
+
+    def json_response(status, body, cache_status):
+        return web.Response(
+            status=status, body=body, content_type='application/json',
+            headers={'X-Cache': cache_status, 'Access-Control-Allow-Origin': '*'}
+        )
+
+    async def compute_response(key, compute):
+        status, payload = await compute()
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        if status == 200 and cache_size > 0:
+            responses[key] = (time.monotonic() + cache_ttl, body)
+            responses.move_to_end(key)
+            while len(responses) > cache_size:
+                responses.popitem(last=False)
+        return status, body
+
+    async def respond(request, compute):
+        key = request.path_qs
+        cached = responses.get(key)
+        if cached and cached[0] > time.monotonic():
+            responses.move_to_end(key)
+            return json_response(200, cached[1], "HIT")
+        task = in_flight.get(key)
+        cache_status = "COALESCED"
+        if task is None:
+            task = asyncio.ensure_future(compute_response(key, compute))
+            in_flight[key] = task
+            task.add_done_callback(lambda _: in_flight.pop(key, None))
+            cache_status = "MISS"
+        # Shielded so one client disconnecting doesn't cancel the others' response
+        status, body = await asyncio.shield(task)
+        return json_response(status, body, cache_status)
+
+    async def run_blocking(func, *args):
+        # Cache lookups can fall back to blocking PokeAPI requests or store scans, so they run
+        # on the default thread pool instead of stalling every other client on the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def cached_lookup(query):
+        key = resolve_pokemon_key(query)
+        return key, get_cached_pokemon(key)
+
+    async def pokemon_handler(request):
+        # GET /pokemon/{name_or_id}: record and type matchup analysis
+        query = request.match_info['name_or_id']
+
+        async def compute():
+            key, record = await run_blocking(cached_lookup, query)
+            source = "cache"
+            if record is None:
+                record, source = await fetch_pokemon_record(request.app['session'], key)
+            return (200 if record else 404), await run_blocking(lookup_result, query, record, source)
+        return await respond(request, compute)
+
+    async def search_handler(request):
+        # GET /search?q=<query>[&prefix=1]: matching names
+        query = request.query.get('q', '').strip()
+        prefix_only = request.query.get('prefix', '') in ('1', 'true', 'yes')
+
+        async def compute():
+            if not query:
+                return 400, {'error': "Missing query parameter 'q'"}
+            results, source = await run_blocking(search_pokemon, query, prefix_only)
+            return 200, {'query': query, 'source': source, 'results': sorted(results)}
+        return await respond(request, compute)
+
+    async def matchup_handler(request):
+        # GET /matchup/{attacking_type}[?top=N&order=weak|resistant]: pokemon ranked by multiplier
+        attacking_type = request.match_info['attacking_type'].lower()
+        order = request.query.get('order', 'weak')
+
+        async def compute():
+            if attacking_type not in TYPE_INDEX:
+                return 404, {'error': f"Unknown type: {attacking_type}"}
+            try:
+                top_n = int(request.query.get('top', 10))
+            except ValueError:
+                return 400, {'error': "'top' must be an integer"}
+            if top_n < 1:
+                return 400, {'error': "'top' must be at least 1"}
+            if order not in ('weak', 'resistant'):
+                return 400, {'error': "'order' must be 'weak' or 'resistant'"}
+            ranking = await run_blocking(rank_pokemon_by_matchup, attacking_type, top_n, order == 'weak')
+            return 200, {
+                'attacking_type': attacking_type,
+                'order': order,
+                'results': [{'name': name, 'multiplier': multiplier} for name, multiplier in ranking]
+            }
+        return await respond(request, compute)
+
+    async def typing_handler(request):
+        # GET /typing/{type}[,{type}]: defensive profile of a single or dual typing
+        types = [t for t in request.match_info['types'].lower().split(',') if t]
+
+        async def compute():
+            unknown = [t for t in types if t not in TYPE_INDEX]
+            if unknown or not 1 <= len(types) <= 2:
+                return 404, {'error': f"Unknown typing: {','.join(types)}"}
+            if len(set(types)) != len(types):
+                return 400, {'error': f"Repeated type in typing: {','.join(types)}"}
+            damage_multipliers, groups = await run_blocking(get_type_profile, types)
+            return 200, {
+                'types': types,
+                'multipliers': dict(damage_multipliers),
+                'groups': {bucket: list(type_names) for bucket, type_names in groups.items()}
+            }
+        return await respond(request, compute)
+
+    async def start_session(app):
+        app['session'] = create_async_session()
+
+    async def close_session(app):
+        await app['session'].close()
+        save_all_pokemon_data()
+
+    app = web.Application()
+    app.router.add_get('/pokemon/{name_or_id}', pokemon_handler)
+    app.router.add_get('/search', search_handler)
+    app.router.add_get('/matchup/{attacking_type}', matchup_handler)
+    app.router.add_get('/typing/{types}', typing_handler)
+    app.on_startup.append(start_session)
+    app.on_cleanup.append(close_session)
+    return app
+
+def run_server(host=SERVER_HOST, port=SERVER_PORT):
+    # Serve the JSON API until interrupted; caches are warmed before accepting requests
+    from aiohttp import web
+    load_snapshot()
+    load_all_type_data()
+    load_all_pokemon_data()
+    get_all_pokemon_names()
+    print(f"Serving Pokédex API on http://{host}:{port} (Ctrl+C to stop)")
+    web.run_app(create_server_app(), host=host, port=port, print=None)
+
 def load_full_cache():
     print("Loading full Pokémon cache...")
     pokemon_names, source = get_all_pokemon_names()
@@ -455,44 +2043,45 @@ def load_full_cache():
     total_pokemon = len(pokemon_names)
     print(f"Found {total_pokemon} Pokémon to cache")
     
-    # Load cache data (in-memory)
+    # Skip entries a previous (possibly interrupted) run already stored, or the snapshot has
     global POKEMON_DATA_CACHE
     if POKEMON_DATA_CACHE is None:
-        POKEMON_DATA_CACHE = {}
+        POKEMON_DATA_CACHE = create_pokemon_cache()
+    cached_keys = store_keys() | set(POKEMON_DATA_CACHE) | set(load_snapshot().get('records', {}))
+    pending_names = [name for name in pokemon_names if name not in cached_keys]
+    if len(pending_names) < total_pokemon:
+        print(f"Resuming: {total_pokemon - len(pending_names)} Pokémon already cached")
     loaded = 0
     failed = 0
 
-    async def fetch_and_store(session, name):
-        url = f"https://pokeapi.co/api/v2/pokemon/{name}"
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return (name, data, True)
-                else:
-                    return (name, None, False)
-        except Exception:
-            return (name, None, False)
-
     async def fetch_all_pokemon():
         nonlocal loaded, failed
-        connector = aiohttp.TCPConnector(limit=32)
-        timeout = aiohttp.ClientTimeout(total=60)
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            tasks = [fetch_and_store(session, name) for name in pokemon_names]
-            for i, future in enumerate(asyncio.as_completed(tasks), 1):
-                name, data, success = await future
-                if success and data:
-                    POKEMON_DATA_CACHE[name] = data
+        limiter = AdaptiveLimiter()
+        async with create_async_session(limit=limiter.maximum) as session:
+            i = 0
+            async for name, status, data in crawl_json(session, pending_names, "pokemon/{}", limiter):
+                i += 1
+                if status == 200 and data:
+                    cache_pokemon(name, PokemonRecord.from_api(data), data)
                     loaded += 1
                 else:
+                    if status == 404:
+                        remember_missing(name)
                     failed += 1
+                # Checkpoint completed entries so an interrupted run can resume
+                if loaded and loaded % CHECKPOINT_BATCH_SIZE == 0:
+                    save_all_pokemon_data()
                 if i % 10 == 0:
-                    print(f"Progress: {i}/{total_pokemon} Pokémon cached")
+                    print(f"Progress: {i}/{len(pending_names)} Pokémon cached (concurrency {int(limiter.limit)})")
 
-    asyncio.run(fetch_all_pokemon())
+    try:
+        asyncio.run(fetch_all_pokemon())
+    except KeyboardInterrupt:
+        save_all_pokemon_data()
+        print(f"\nInterrupted: saved {loaded} Pokémon, run 'load' again to resume")
+        return False
     
-    # Save the updated cache once at the end
+    # Save whatever completed since the last checkpoint
     save_all_pokemon_data()
     
     print(f"\nCache loading complete!")
@@ -501,17 +2090,123 @@ def load_full_cache():
         print(f"Failed to cache: {failed} Pokémon")
     return True
 
+def refresh_cache(max_age=0):
+    # Revalidate cached entries fetched more than max_age seconds ago with conditional
+    # requests (If-None-Match / If-Modified-Since), re-downloading only changed entries
+    print("Refreshing cache...")
+    get_all_pokemon_names()
+    if POKEMON_TYPES_CACHE is None:
+        load_all_type_data()
+    paths = [POKEMON_NAMES_PATH]
+    paths += [f"type/{type_name}" for type_name in sorted(POKEMON_TYPES_CACHE or {})]
+    paths += [f"pokemon/{key}" for key in sorted(store_keys() | set(POKEMON_DATA_CACHE or {}))]
+
+    metadata = load_fetch_metadata()
+    cutoff = time.time() - max_age
+    paths = [path for path in paths if path not in metadata or metadata[path][0] <= cutoff]
+    print(f"Revalidating {len(paths)} cache entries")
+
+    def conditional_headers(path):
+        # Entries cached before metadata was recorded are simply re-downloaded
+        _, etag, last_modified = metadata.get(path, (None, None, None))
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    unchanged = 0
+    changed = 0
+    failed = 0
+    types_changed = False
+
+    async def revalidate_all():
+        nonlocal unchanged, changed, failed, types_changed
+        global POKEMON_NAMES_CACHE
+        limiter = AdaptiveLimiter()
+        async with create_async_session(limit=limiter.maximum) as session:
+            async for path, status, data in crawl_json(session, paths, "{}", limiter, conditional_headers):
+                if status == 304:
+                    unchanged += 1
+                    continue
+                if status != 200 or not data:
+                    failed += 1
+                    continue
+                changed += 1
+                if path == POKEMON_NAMES_PATH:
+                    POKEMON_NAMES_CACHE = [pokemon['name'] for pokemon in data['results']]
+                    save_cache(POKEMON_NAMES_CACHE_FILE, POKEMON_NAMES_CACHE)
+                elif path.startswith("type/"):
+                    POKEMON_TYPES_CACHE[path[len("type/"):]] = data
+                    types_changed = True
+                else:
+                    key = path[len("pokemon/"):]
+                    cache_pokemon(key, PokemonRecord.from_api(data), data)
+
+    asyncio.run(revalidate_all())
+    if types_changed:
+        save_type_data()
+        build_type_chart()
+    save_all_pokemon_data()
+
+    print(f"Unchanged: {unchanged}, updated: {changed}, failed: {failed}")
+    return failed == 0
+
+def build_snapshot(file_path=None):
+    # Build step: download everything the snapshot holds (reusing local caches) and write it
+    global SNAPSHOT
+    file_path = file_path or SNAPSHOT_FILE
+    # Build from local caches and the network only, never from a previous snapshot
+    SNAPSHOT = {}
+    load_all_type_data()
+    load_all_pokemon_data()
+    if not load_full_cache():
+        print("Snapshot not written: the Pokémon data could not be fully loaded")
+        return False
+    missing_types = [t for t in TYPE_NAMES if t not in POKEMON_TYPES_CACHE]
+    if missing_types:
+        print(f"Snapshot not written: missing type data for {', '.join(missing_types)}")
+        return False
+    build_type_chart()
+
+    pokemon_names, _ = get_all_pokemon_names()
+    records = {}
+    for name in pokemon_names:
+        record = get_cached_pokemon(name)
+        if record:
+            records[name] = record.to_dict()
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'type_names': TYPE_NAMES,
+        'type_chart': TYPE_CHART.tolist(),
+        'names': pokemon_names,
+        'records': records
+    }
+    save_cache(file_path, snapshot, cache_format="json+gzip")
+    # Shipped with the package, so readable by everyone unlike the private cache files
+    os.chmod(file_path, 0o644)
+    print(f"Wrote snapshot with {len(pokemon_names)} names and {len(records)} Pokémon to {file_path}")
+    # Use the new snapshot from here on
+    SNAPSHOT = None
+    return True
+
+atexit.register(flush_caches)
+
 def main():
     print("Pokédex - Offline Capable")
     print("Cache directory:", CACHE_DIR)
     print("\nCommands:")
     print("  search <query> - Search for Pokémon by name or type")
     print("  load          - Preload the cache with all Pokémon data")
+    print("  refresh       - Revalidate cached data and download only what changed")
     print("  clear         - Clear the cache")
     print("  quit          - Exit the program")
     
-    # Load caches into memory at startup
-    load_all_type_data()
+    # Load caches into memory at startup; with a snapshot nothing needs the network up front
+    load_snapshot()
+    load_all_type_data(background=True)
     load_all_pokemon_data()
     
     while True:
@@ -536,6 +2231,11 @@ def main():
             if pokemon_input.lower() == 'load':
                 load_full_cache()
                 continue
+
+            # Check for refresh command
+            if pokemon_input.lower() == 'refresh':
+                refresh_cache()
+                continue
                 
             # Check for search command
             if pokemon_input.lower().startswith('search '):
@@ -578,4 +2278,29 @@ def main():
             print("Please try again with a valid Pokémon name or ID")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pokédex - Offline Capable")
+    parser.add_argument(
+        "--build-snapshot", nargs="?", const=SNAPSHOT_FILE, metavar="PATH",
+        help="download all data and write the offline snapshot (default: %(const)s)"
+    )
+    parser.add_argument(
+        "--batch", nargs="?", const="-", metavar="FILE",
+        help="look up one name or ID per line from FILE (default: stdin) and print JSON lines"
+    )
+    parser.add_argument("--serve", action="store_true", help="serve lookups, search and matchups as a JSON API")
+    parser.add_argument("--host", default=SERVER_HOST, help="address to serve on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="port to serve on (default: %(default)s)")
+    parser.add_argument(
+        "--base-url", default=POKEAPI_BASE_URL,
+        help="PokeAPI base URL, also read from $POKEAPI_BASE_URL (default: %(default)s)"
+    )
+    args = parser.parse_args()
+    POKEAPI_BASE_URL = args.base_url.rstrip('/')
+    if args.serve:
+        run_server(args.host, args.port)
+        sys.exit(0)
+    if args.build_snapshot:
+        sys.exit(0 if build_snapshot(args.build_snapshot) else 1)
+    if args.batch:
+        sys.exit(0 if run_batch(args.batch) else 1)
     main()
\ No newline at end of file